@@ -6,18 +6,52 @@ Maintains and queries per-sender communication baselines for behavioral
 deviation detection. Updates baselines incrementally with each new email.
 """
 
-import json
 import re
+import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 
+import orjson
 import structlog
 
 from ...db.repositories.baseline_repo import BaselineRepository
+from .features import EmailFeatures, extract_features
 
 logger = structlog.get_logger(__name__)
 
 
+def hours_to_mask(raw: Any) -> int:
+    """
+    Coerce a stored typical_hours value to a 24-bit mask (bit h = hour h).
+    Rows written before the mask format hold a JSON list of hours.
+    """
+    if not raw:
+        return 0
+    if isinstance(raw, int):
+        return raw
+    raw = str(raw)
+    if raw.startswith("["):
+        try:
+            hours = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            return 0
+        mask = 0
+        for hour in hours:
+            if isinstance(hour, int) and 0 <= hour < 24:
+                mask |= 1 << hour
+        return mask
+    try:
+        return int(raw)
+    except ValueError:
+        return 0
+
+
+def mask_to_hours(mask: int) -> List[int]:
+    """Expand a 24-bit hour mask into a sorted list of hours."""
+    return [hour for hour in range(24) if (mask >> hour) & 1]
+
+
 class BaselineEngine:
     """
     Manages per-sender behavioral baselines.
@@ -39,8 +73,24 @@ class BaselineEngine:
     # Exponential moving average smoothing factor
     EMA_ALPHA = 0.15
 
+    # In-process LRU cache of baseline lookups per (recipient, sender)
+    CACHE_TTL_SECONDS = 30.0
+    CACHE_MAX_ENTRIES = 10_000
+
+    # All markers merged into one alternation so the body is scanned once.
+    # The lookahead reports a match at every start position, so overlapping
+    # markers (e.g. "regards" inside "best regards") are all seen. Group names
+    # are "f<i>" / "i<i>" for formal / informal marker i.
+    _MARKERS_RE = re.compile(
+        "(?=" + "|".join(
+            [f"(?P<f{i}>{p.replace('(', '(?:')})" for i, p in enumerate(FORMALITY_MARKERS)]
+            + [f"(?P<i{i}>{p.replace('(', '(?:')})" for i, p in enumerate(INFORMAL_MARKERS)]
+        ) + ")"
+    )
+
     def __init__(self, baseline_repo: BaselineRepository):
         self.repo = baseline_repo
+        self._cache: OrderedDict[Tuple[str, str], Tuple[float, Optional[Dict[str, Any]]]] = OrderedDict()
 
     async def get_baseline(
         self,
@@ -52,26 +102,39 @@ class BaselineEngine:
 
         Returns:
             Baseline dict with avg_word_count, avg_sentence_length,
-            typical_hours, formality_score, etc. or None if no baseline exists.
+            typical_hours (list), typical_hours_mask (24-bit int),
+            formality_score, etc. or None if no baseline exists.
+            Lookups are cached for CACHE_TTL_SECONDS; each call returns
+            a fresh dict so callers may annotate it.
         """
+        key = (recipient_email, sender_email)
+        now = time.monotonic()
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > now:
+            self._cache.move_to_end(key)
+            baseline = cached[1]
+            return dict(baseline) if baseline is not None else None
+
         baseline_row = await self.repo.get_baseline(recipient_email, sender_email)
         if baseline_row is None:
-            return None
-
-        typical_hours = []
-        if baseline_row.typical_hours:
-            try:
-                typical_hours = json.loads(baseline_row.typical_hours)
-            except (json.JSONDecodeError, TypeError):
-                typical_hours = []
-
-        return {
-            "avg_word_count": baseline_row.avg_word_count or 0.0,
-            "avg_sentence_length": baseline_row.avg_sentence_length or 0.0,
-            "typical_hours": typical_hours,
-            "formality_score": baseline_row.formality_score or 0.5,
-            "sample_count": baseline_row.sample_count or 0,
-        }
+            baseline = None
+        else:
+            hours_mask = hours_to_mask(baseline_row.typical_hours)
+            baseline = {
+                "avg_word_count": baseline_row.avg_word_count or 0.0,
+                "avg_sentence_length": baseline_row.avg_sentence_length or 0.0,
+                "typical_hours": mask_to_hours(hours_mask),
+                "typical_hours_mask": hours_mask,
+                "formality_score": baseline_row.formality_score or 0.5,
+                "sample_count": baseline_row.sample_count or 0,
+            }
+
+        self._cache[key] = (now + self.CACHE_TTL_SECONDS, baseline)
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.CACHE_MAX_ENTRIES:
+            self._cache.popitem(last=False)
+
+        return dict(baseline) if baseline is not None else None
 
     async def update_baseline(
         self,
@@ -79,90 +142,63 @@ class BaselineEngine:
         sender_email: str,
         body: str,
         received_at: Optional[datetime] = None,
+        features: Optional[EmailFeatures] = None,
     ) -> None:
         """
         Update the sender's behavioral baseline with data from a new email.
-        Uses exponential moving average for smooth incremental updates.
+        Uses exponential moving average for smooth incremental updates,
+        applied by the repository in a single upsert (no prior read).
+
+        Pass precomputed `features` to reuse the tokenization already done
+        for deviation scoring; otherwise they are computed from `body`.
         """
         # Compute metrics for this email
-        word_count = len(body.split())
-        sentences = re.split(r'[.!?]+', body)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        avg_sentence_len = word_count / max(len(sentences), 1)
-        formality = self._compute_formality(body)
+        if features is None:
+            features = extract_features(body)
+        word_count = features.word_count
+        avg_sentence_len = features.avg_sentence_length
+        formality = self._compute_formality(features.text_lower)
         send_hour = received_at.hour if received_at else None
 
-        existing = await self.repo.get_baseline(recipient_email, sender_email)
-
-        if existing is None:
-            # Create new baseline
-            typical_hours = json.dumps([send_hour]) if send_hour is not None else "[]"
-            await self.repo.upsert_baseline(
-                recipient_email=recipient_email,
-                sender_email=sender_email,
-                avg_word_count=float(word_count),
-                avg_sentence_length=round(avg_sentence_len, 2),
-                typical_hours=typical_hours,
-                formality_score=round(formality, 4),
-                sample_count=1,
-            )
+        sample_count = await self.repo.upsert_baseline_with_ema(
+            recipient_email=recipient_email,
+            sender_email=sender_email,
+            word_count=word_count,
+            avg_sentence_length=avg_sentence_len,
+            formality_score=formality,
+            send_hour=send_hour,
+            alpha=self.EMA_ALPHA,
+        )
+        self._cache.pop((recipient_email, sender_email), None)
+
+        if sample_count == 1:
             logger.info(
                 "baseline.created",
                 recipient=recipient_email,
                 sender=sender_email,
             )
         else:
-            # Update with EMA
-            alpha = self.EMA_ALPHA
-            new_avg_wc = (alpha * word_count) + ((1 - alpha) * (existing.avg_word_count or 0))
-            new_avg_sl = (alpha * avg_sentence_len) + ((1 - alpha) * (existing.avg_sentence_length or 0))
-            new_formality = (alpha * formality) + ((1 - alpha) * (existing.formality_score or 0.5))
-
-            # Update typical hours
-            try:
-                hours_list = json.loads(existing.typical_hours or "[]")
-            except (json.JSONDecodeError, TypeError):
-                hours_list = []
-
-            if send_hour is not None and send_hour not in hours_list:
-                hours_list.append(send_hour)
-                # Keep only the most common 8 hours
-                if len(hours_list) > 8:
-                    hours_list = hours_list[-8:]
-
-            await self.repo.upsert_baseline(
-                recipient_email=recipient_email,
-                sender_email=sender_email,
-                avg_word_count=round(new_avg_wc, 2),
-                avg_sentence_length=round(new_avg_sl, 2),
-                typical_hours=json.dumps(sorted(hours_list)),
-                formality_score=round(new_formality, 4),
-                sample_count=(existing.sample_count or 0) + 1,
-            )
             logger.debug(
                 "baseline.updated",
                 recipient=recipient_email,
                 sender=sender_email,
-                sample_count=(existing.sample_count or 0) + 1,
+                sample_count=sample_count,
             )
 
-    def _compute_formality(self, text: str) -> float:
+    def _compute_formality(self, text_lower: str) -> float:
         """
         Compute a formality score (0.0 = very informal, 1.0 = very formal).
-        Uses pattern matching on formal/informal linguistic markers.
+        Uses pattern matching on formal/informal linguistic markers in the
+        already-lowercased body.
         """
-        text_lower = text.lower()
-        formal_hits = sum(
-            1 for pattern in self.FORMALITY_MARKERS
-            if re.search(pattern, text_lower, re.IGNORECASE)
-        )
-        informal_hits = sum(
-            1 for pattern in self.INFORMAL_MARKERS
-            if re.search(pattern, text_lower, re.IGNORECASE)
-        )
+        if not text_lower:
+            return 0.5  # Neutral
+        matched = {m.lastgroup for m in self._MARKERS_RE.finditer(text_lower)}
+        formal_hits = sum(1 for name in matched if name[0] == "f")
+        informal_hits = len(matched) - formal_hits
 
         total = formal_hits + informal_hits
         if total == 0:
             return 0.5  # Neutral
 
-        return round(formal_hits / total, 4)
+        return formal_hits / total
@@ -6,7 +6,7 @@ Detects evidence of coordinated multi-channel social engineering attacks
 by analyzing temporal patterns across different communication channels.
 """
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional, List, Dict, Any
 
 import structlog
@@ -53,18 +53,19 @@ class CrossChannelDetector:
             channels_used (list), and recent_analysis_count (int).
         """
         if received_at is None:
-            received_at = datetime.utcnow()
+            received_at = datetime.now(timezone.utc)
 
-        window_start = received_at - timedelta(hours=self.COORDINATION_WINDOW_HOURS)
+        window_start = received_at - _COORDINATION_WINDOW
 
-        # Query recent analyses from this sender to this recipient
-        recent_analyses = await self.analysis_repo.get_recent_by_sender_recipient(
+        # Aggregate recent analyses from this sender to this recipient in SQL
+        stats = await self.analysis_repo.get_coordination_stats(
             recipient_email=recipient_email,
             sender_email=sender_email,
             since=window_start,
         )
+        analysis_count = stats["count"]
 
-        if not recent_analyses:
+        if not analysis_count:
             return {
                 "coordination_detected": False,
                 "score": 0.0,
@@ -72,15 +73,11 @@ class CrossChannelDetector:
                 "recent_analysis_count": 0,
             }
 
-        # Collect unique channels
-        channels = set()
-        channels.add(current_channel)
-        for analysis in recent_analyses:
-            if analysis.channel:
-                channels.add(analysis.channel)
+        channels = {current_channel, *stats["channels"]}
+        first_score = stats["first_score"]
+        last_score = stats["last_score"]
 
         coordination_detected = len(channels) >= self.MIN_CHANNELS_FOR_SIGNAL
-        analysis_count = len(recent_analyses)
 
         # Score based on number of channels and frequency
         score = 0.0
@@ -90,8 +87,7 @@ class CrossChannelDetector:
             # Frequency bonus (more messages in the window = more suspicious)
             score += min(analysis_count * 10.0, 30.0)
             # Check for escalation pattern
-            scores = [a.manipulation_score for a in recent_analyses if a.manipulation_score is not None]
-            if len(scores) >= 2 and scores[-1] > scores[0]:
+            if first_score is not None and last_score > first_score:
                 score += 20.0  # Escalation detected
 
         score = min(100.0, max(0.0, score))
@@ -113,3 +109,6 @@ class CrossChannelDetector:
             )
 
         return result
+
+
+_COORDINATION_WINDOW = timedelta(hours=CrossChannelDetector.COORDINATION_WINDOW_HOURS)
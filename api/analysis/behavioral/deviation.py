@@ -7,16 +7,24 @@ against the sender's established behavioral baseline.
 """
 
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional, Dict, Any
 
 import structlog
 
+from .features import EmailFeatures, extract_features
+
 logger = structlog.get_logger(__name__)
 
+# Circular distance between two hours of the day: _HOUR_DIST[a][b]
+_HOUR_DIST = tuple(
+    tuple(min(abs(a - b), 24 - abs(a - b)) for b in range(24))
+    for a in range(24)
+)
+
 
-@dataclass
+@dataclass(slots=True)
 class DeviationContext:
     """Result of deviation scoring against sender baseline."""
     deviation_score: float = 0.0
@@ -24,11 +32,7 @@ class DeviationContext:
     sentence_length_deviation: float = 0.0
     timing_deviation: float = 0.0
     formality_deviation: float = 0.0
-    details: dict = None
-
-    def __post_init__(self):
-        if self.details is None:
-            self.details = {}
+    details: dict = field(default_factory=dict)
 
 
 class DeviationScorer:
@@ -37,17 +41,38 @@ class DeviationScorer:
     established behavioral baseline across multiple dimensions.
     """
 
+    # Baseline samples required before deviation is scored
+    MIN_SAMPLES = 3
+
     # Deviation thresholds (percentage deviation from baseline)
     WORD_COUNT_WEIGHT = 0.30
     SENTENCE_LENGTH_WEIGHT = 0.15
     TIMING_WEIGHT = 0.25
     FORMALITY_WEIGHT = 0.30
 
+    # Literal substring markers for quick formality estimation
+    QUICK_FORMAL_MARKERS = (
+        "dear", "sincerely", "regards", "respectfully", "kindly",
+        "hereby", "pursuant", "attached herewith", "please find",
+    )
+    QUICK_INFORMAL_MARKERS = (
+        "hey", "hi", "yo", "gonna", "wanna", "gotta", "lol",
+        "haha", "btw", "fyi", "thx", "awesome", "cool",
+    )
+
+    # One alternation over all markers, wrapped in a lookahead so that
+    # overlapping occurrences are reported (substring semantics, same as `in`)
+    _QUICK_MARKERS_RE = re.compile(
+        "(?=(" + "|".join(map(re.escape, QUICK_FORMAL_MARKERS + QUICK_INFORMAL_MARKERS)) + "))"
+    )
+    _QUICK_FORMAL_SET = frozenset(QUICK_FORMAL_MARKERS)
+
     def score(
         self,
         body: str,
         received_at: Optional[datetime],
         baseline: Optional[Dict[str, Any]],
+        features: Optional[EmailFeatures] = None,
     ) -> DeviationContext:
         """
         Compute deviation score (0-100) comparing email to sender baseline.
@@ -56,18 +81,20 @@ class DeviationScorer:
             body: Plain-text email body.
             received_at: When the email was received.
             baseline: Sender baseline dict from BaselineEngine, or None.
+            features: Precomputed text features for `body`, or None to
+                      compute them here.
 
         Returns:
             DeviationContext with scores and details.
         """
-        if baseline is None or baseline.get("sample_count", 0) < 3:
+        if baseline is None or baseline.get("sample_count", 0) < self.MIN_SAMPLES:
             # Not enough data for meaningful deviation scoring
             return DeviationContext(deviation_score=0.0)
 
-        word_count = len(body.split())
-        sentences = re.split(r'[.!?]+', body)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        avg_sentence_len = word_count / max(len(sentences), 1)
+        if features is None:
+            features = extract_features(body)
+        word_count = features.word_count
+        avg_sentence_len = features.avg_sentence_length
 
         # Word count deviation
         baseline_wc = baseline.get("avg_word_count", 0)
@@ -88,14 +115,14 @@ class DeviationScorer:
         # Timing deviation
         timing_score = 0.0
         if received_at is not None:
-            typical_hours = baseline.get("typical_hours", [])
-            if typical_hours and isinstance(typical_hours, list):
+            hours_mask = baseline.get("typical_hours_mask", 0)
+            if hours_mask:
                 send_hour = received_at.hour
-                if send_hour not in typical_hours:
+                if not (hours_mask >> send_hour) & 1:
                     # Compute minimum distance to any typical hour
+                    distances = _HOUR_DIST[send_hour]
                     min_distance = min(
-                        min(abs(send_hour - h), 24 - abs(send_hour - h))
-                        for h in typical_hours
+                        distances[h] for h in range(24) if (hours_mask >> h) & 1
                     )
                     # Scale: 6+ hours away = max deviation
                     timing_score = min(100.0, (min_distance / 6.0) * 100)
@@ -103,7 +130,7 @@ class DeviationScorer:
         # Formality deviation
         formality_score = 0.0
         baseline_formality = baseline.get("formality_score", 0.5)
-        current_formality = self._quick_formality(body)
+        current_formality = self._quick_formality(features.text_lower)
         formality_diff = abs(current_formality - baseline_formality)
         formality_score = min(100.0, formality_diff * 200)  # 0.5 diff = 100
 
@@ -115,18 +142,18 @@ class DeviationScorer:
             formality_score * self.FORMALITY_WEIGHT
         )
 
-        aggregate = round(min(100.0, max(0.0, aggregate)), 2)
+        aggregate = min(100.0, max(0.0, aggregate))
 
         context = DeviationContext(
             deviation_score=aggregate,
-            word_count_deviation=round(wc_score, 2),
-            sentence_length_deviation=round(sl_score, 2),
-            timing_deviation=round(timing_score, 2),
-            formality_deviation=round(formality_score, 2),
+            word_count_deviation=wc_score,
+            sentence_length_deviation=sl_score,
+            timing_deviation=timing_score,
+            formality_deviation=formality_score,
             details={
                 "current_word_count": word_count,
                 "baseline_word_count": baseline_wc,
-                "current_avg_sentence_length": round(avg_sentence_len, 2),
+                "current_avg_sentence_length": avg_sentence_len,
                 "baseline_avg_sentence_length": baseline_sl,
                 "send_hour": received_at.hour if received_at else None,
                 "typical_hours": baseline.get("typical_hours", []),
@@ -135,7 +162,7 @@ class DeviationScorer:
 
         logger.debug(
             "deviation.scored",
-            aggregate=aggregate,
+            aggregate=round(aggregate, 2),
             word_count_dev=round(wc_score, 2),
             timing_dev=round(timing_score, 2),
             formality_dev=round(formality_score, 2),
@@ -143,21 +170,15 @@ class DeviationScorer:
 
         return context
 
-    @staticmethod
-    def _quick_formality(text: str) -> float:
-        """Quick formality estimation for deviation comparison."""
-        text_lower = text.lower()
-        formal_markers = [
-            "dear", "sincerely", "regards", "respectfully", "kindly",
-            "hereby", "pursuant", "attached herewith", "please find",
-        ]
-        informal_markers = [
-            "hey", "hi", "yo", "gonna", "wanna", "gotta", "lol",
-            "haha", "btw", "fyi", "thx", "awesome", "cool",
-        ]
-        formal_count = sum(1 for m in formal_markers if m in text_lower)
-        informal_count = sum(1 for m in informal_markers if m in text_lower)
+    @classmethod
+    def _quick_formality(cls, text_lower: str) -> float:
+        """Quick formality estimation for deviation comparison on lowercased text."""
+        if not text_lower:
+            return 0.5
+        found = {m.group(1) for m in cls._QUICK_MARKERS_RE.finditer(text_lower)}
+        formal_count = len(found & cls._QUICK_FORMAL_SET)
+        informal_count = len(found) - formal_count
         total = formal_count + informal_count
         if total == 0:
             return 0.5
-        return round(formal_count / total, 4)
+        return formal_count / total
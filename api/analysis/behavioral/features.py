@@ -0,0 +1,49 @@
+"""
+MindWall — Email Text Features
+Developed by Pradyumn Tandon (https://pradyumntandon.com) at VRIP7 (https://vrip7.com)
+
+Per-email text statistics shared by the baseline engine and the deviation
+scorer, so each body is tokenized once per analysis instead of once per engine.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Tuple
+
+# One match per sentence: a run between [.!?] terminators that contains at
+# least one non-whitespace character
+_SENTENCE_RE = re.compile(r"[^.!?\s][^.!?]*")
+
+# Any letter. Formality markers are all alphabetic, so a body without one
+# can skip lowercasing and marker scanning entirely
+_LETTER_RE = re.compile(r"[^\W\d_]")
+
+
+@dataclass(slots=True)
+class EmailFeatures:
+    """Text statistics computed once from an email body."""
+    word_count: int = 0
+    avg_sentence_length: float = 0.0
+    # Lowercased body shared by the formality scans; empty if it has no letters
+    text_lower: str = ""
+
+
+def _scan_body(body: str) -> Tuple[int, int]:
+    """
+    Return (word_count, sentence_count) for an email body.
+
+    Both counts run as C-level scans: str.split() for words and findall()
+    for sentences. A fused per-character or per-token pass in Python
+    iterates in the interpreter and is slower than these two.
+    """
+    return len(body.split()), len(_SENTENCE_RE.findall(body))
+
+
+def extract_features(body: str) -> EmailFeatures:
+    """Compute word count, average sentence length and lowercased text for an email body."""
+    word_count, sentence_count = _scan_body(body)
+    return EmailFeatures(
+        word_count=word_count,
+        avg_sentence_length=word_count / max(sentence_count, 1),
+        text_lower=body.lower() if _LETTER_RE.search(body) else "",
+    )
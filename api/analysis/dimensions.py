@@ -7,7 +7,7 @@ Defines the 12-dimensional manipulation scoring framework used by the analysis e
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict
+from typing import Dict, Tuple
 
 
 class Dimension(Enum):
@@ -41,8 +41,17 @@ DIMENSION_WEIGHTS: Dict[Dimension, float] = {
     Dimension.TIMING_ANOMALY: 0.03,
 }
 
+# Dimension values in Dimension order
+DIMENSION_NAMES: Tuple[str, ...] = tuple(dimension.value for dimension in Dimension)
 
-@dataclass
+# (dimension value, weight) pairs in Dimension order, for aggregating
+# score dicts keyed by dimension name without per-item enum lookups
+DIMENSION_WEIGHT_PAIRS: Tuple[Tuple[str, float], ...] = tuple(
+    (dimension.value, DIMENSION_WEIGHTS[dimension]) for dimension in Dimension
+)
+
+
+@dataclass(slots=True)
 class DimensionInfo:
     """Metadata about a manipulation dimension."""
     dimension: Dimension
@@ -51,7 +60,7 @@ class DimensionInfo:
     weight: float
 
 
-DIMENSION_REGISTRY: list[DimensionInfo] = [
+DIMENSION_REGISTRY: Tuple[DimensionInfo, ...] = (
     DimensionInfo(
         dimension=Dimension.ARTIFICIAL_URGENCY,
         name="Artificial Urgency",
@@ -124,4 +133,9 @@ DIMENSION_REGISTRY: list[DimensionInfo] = [
         description="Suspicious timing relative to sender's typical communication patterns",
         weight=DIMENSION_WEIGHTS[Dimension.TIMING_ANOMALY],
     ),
-]
+)
+
+# O(1) metadata lookup by dimension
+DIMENSION_INFO: Dict[Dimension, DimensionInfo] = {
+    info.dimension: info for info in DIMENSION_REGISTRY
+}
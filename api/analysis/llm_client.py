@@ -6,11 +6,53 @@ Async HTTP client for communicating with the Ollama LLM inference server.
 """
 
 import asyncio
+import time
+from typing import Optional
+
 import httpx
+import orjson
 import structlog
 
 logger = structlog.get_logger(__name__)
 
+# Request bodies are serialized with orjson straight to UTF-8 bytes rather
+# than through httpx's json= (stdlib json.dumps, then a separate encode)
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+class _JsonObjectEnd:
+    """
+    Tracks brace depth across streamed text to spot where the top-level
+    JSON object closes. Braces inside string literals are ignored.
+    """
+
+    __slots__ = ("depth", "in_string", "escaped")
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text: str) -> bool:
+        """Consume the next piece of output; True once the object is closed."""
+        for ch in text:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch == "{":
+                self.depth += 1
+            elif ch == "}" and self.depth > 0:
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
+
 
 class OllamaClientError(Exception):
     """Raised when the Ollama LLM client encounters an error."""
@@ -23,14 +65,30 @@ class OllamaClient:
     Sends structured prompts and retrieves JSON analysis responses.
     """
 
-    def __init__(self, base_url: str, model: str, timeout: int = 30):
+    # Connection pool shared by every request made through this client
+    POOL_LIMITS = httpx.Limits(
+        max_keepalive_connections=32,
+        max_connections=64,
+        keepalive_expiry=60.0,
+    )
+
+    # How long a check_health() result is reused before /api/tags is queried again
+    HEALTH_TTL_SECONDS = 5.0
+
+    def __init__(self, base_url: str, model: str, timeout: int = 30, keep_alive: str = "24h"):
         self.base_url = base_url.rstrip("/")
         self.model = model
         self.timeout = timeout
+        # How long Ollama keeps the model (and its cached prompt prefix) loaded
+        self.keep_alive = keep_alive
         self._client = httpx.AsyncClient(
             base_url=self.base_url,
             timeout=httpx.Timeout(timeout=float(timeout), connect=10.0),
+            # retries=1 re-attempts failed connection setup only, never a sent request
+            transport=httpx.AsyncHTTPTransport(retries=1, limits=self.POOL_LIMITS),
         )
+        self._health_ok = False
+        self._health_checked_at: Optional[float] = None
 
     async def generate(self, system_prompt: str, user_prompt: str) -> str:
         """
@@ -50,8 +108,9 @@ class OllamaClient:
             "model": self.model,
             "prompt": user_prompt,
             "system": system_prompt,
-            "stream": False,
+            "stream": True,
             "format": "json",
+            "keep_alive": self.keep_alive,
             "options": {
                 "temperature": 0.1,
                 "top_p": 0.9,
@@ -62,10 +121,41 @@ class OllamaClient:
 
         logger.debug("ollama.request", model=self.model, prompt_length=len(user_prompt))
 
+        # Ollama streams NDJSON: one object per generated chunk, the last one
+        # carrying done=true and the eval statistics. Reading stops as soon
+        # as the JSON object closes; leaving the stream early drops the
+        # connection, which makes Ollama stop generating (format=json output
+        # can otherwise run on with trailing whitespace up to num_predict).
+        chunks = []
+        final = {}
+        object_end = _JsonObjectEnd()
+        # httpx's read timeout only bounds each chunk; this caps the whole
+        # generation. self.timeout is read per call, so settings updates apply.
         try:
-            response = await self._client.post("/api/generate", json=payload)
-            response.raise_for_status()
-        except httpx.TimeoutException:
+            async with asyncio.timeout(self.timeout):
+                async with self._client.stream(
+                    "POST", "/api/generate", content=orjson.dumps(payload), headers=_JSON_HEADERS
+                ) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        try:
+                            chunk = orjson.loads(line)
+                        except orjson.JSONDecodeError:
+                            logger.error("ollama.invalid_stream_chunk", model=self.model, chunk=line[:200])
+                            raise OllamaClientError("Ollama returned a malformed stream chunk")
+                        if "error" in chunk:
+                            logger.error("ollama.stream_error", model=self.model, error=chunk["error"])
+                            raise OllamaClientError(f"Ollama error: {chunk['error']}")
+                        text = chunk.get("response", "")
+                        chunks.append(text)
+                        if chunk.get("done"):
+                            final = chunk
+                            break
+                        if object_end.feed(text):
+                            break
+        except (httpx.TimeoutException, TimeoutError):
             logger.error("ollama.timeout", model=self.model, timeout=self.timeout)
             raise OllamaClientError(f"Ollama request timed out after {self.timeout}s")
         except httpx.HTTPStatusError as e:
@@ -79,8 +169,7 @@ class OllamaClient:
             logger.error("ollama.connection_error", error=str(e))
             raise OllamaClientError(f"Ollama connection error: {e}")
 
-        data = response.json()
-        raw_response = data.get("response", "")
+        raw_response = "".join(chunks)
 
         if not raw_response:
             logger.error("ollama.empty_response", model=self.model)
@@ -90,25 +179,38 @@ class OllamaClient:
             "ollama.response",
             model=self.model,
             response_length=len(raw_response),
-            eval_count=data.get("eval_count"),
-            eval_duration_ns=data.get("eval_duration"),
+            eval_count=final.get("eval_count"),
+            eval_duration_ns=final.get("eval_duration"),
         )
 
         return raw_response
 
     async def check_health(self) -> bool:
-        """Check if Ollama server is reachable and model is loaded."""
+        """
+        Check if Ollama server is reachable and model is loaded.
+        Results are cached for HEALTH_TTL_SECONDS so frequent probes
+        don't hit /api/tags every time.
+        """
+        now = time.monotonic()
+        if self._health_checked_at is not None and now - self._health_checked_at < self.HEALTH_TTL_SECONDS:
+            return self._health_ok
+
         try:
             response = await self._client.get("/api/tags")
             response.raise_for_status()
-            tags_data = response.json()
-            models = [m.get("name", "") for m in tags_data.get("models", [])]
-            model_available = any(self.model in m for m in models)
-            logger.info("ollama.health", available=True, model_loaded=model_available, models=models)
-            return True
+            tags_data = orjson.loads(response.content)
+            model_available = any(
+                self.model in m.get("name", "") for m in tags_data.get("models", ())
+            )
+            logger.info("ollama.health", available=True, model_loaded=model_available)
+            healthy = True
         except Exception as e:
             logger.error("ollama.health_failed", error=str(e))
-            return False
+            healthy = False
+
+        self._health_ok = healthy
+        self._health_checked_at = now
+        return healthy
 
     async def ensure_model(self) -> None:
         """Pull the configured model if it is not already available. Retries with backoff."""
@@ -117,27 +219,21 @@ class OllamaClient:
             try:
                 response = await self._client.get("/api/tags")
                 response.raise_for_status()
-                tags_data = response.json()
+                tags_data = orjson.loads(response.content)
                 models = [m.get("name", "") for m in tags_data.get("models", [])]
                 if any(self.model in m for m in models):
                     logger.info("ollama.model_ready", model=self.model)
                     return
 
                 logger.info("ollama.model_pulling", model=self.model, attempt=attempt)
-                pull_client = httpx.AsyncClient(
-                    base_url=self.base_url,
+                pull_response = await self._client.post(
+                    "/api/pull",
+                    json={"name": self.model, "stream": False},
                     timeout=httpx.Timeout(timeout=600.0, connect=30.0),
                 )
-                try:
-                    pull_response = await pull_client.post(
-                        "/api/pull",
-                        json={"name": self.model, "stream": False},
-                    )
-                    pull_response.raise_for_status()
-                    logger.info("ollama.model_pulled", model=self.model)
-                    return
-                finally:
-                    await pull_client.aclose()
+                pull_response.raise_for_status()
+                logger.info("ollama.model_pulled", model=self.model)
+                return
             except Exception as e:
                 logger.error(
                     "ollama.model_pull_failed",
@@ -157,30 +253,61 @@ class OllamaClient:
             message="Model could not be pulled. LLM analysis will fall back to rule-based pre-filter.",
         )
 
-    async def warmup(self) -> None:
-        """Send a minimal generate request to load the model into VRAM."""
+    async def warmup(self, system_prompt: Optional[str] = None) -> None:
+        """
+        Send a minimal generate request to load the model into VRAM.
+        When `system_prompt` is given it is prefilled as well, so the first
+        analyses reuse Ollama's cached prompt prefix.
+        """
         logger.info("ollama.warmup_start", model=self.model)
-        warmup_client = httpx.AsyncClient(
-            base_url=self.base_url,
-            timeout=httpx.Timeout(timeout=300.0, connect=10.0),
-        )
+        payload = {
+            "model": self.model,
+            "prompt": "Hello",
+            "stream": False,
+            "keep_alive": self.keep_alive,
+            "options": {"num_predict": 1},
+        }
+        if system_prompt:
+            payload["system"] = system_prompt
         try:
-            response = await warmup_client.post(
+            response = await self._client.post(
                 "/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": "Hello",
-                    "stream": False,
-                    "options": {"num_predict": 1},
-                },
+                json=payload,
+                timeout=httpx.Timeout(timeout=300.0, connect=10.0),
             )
             response.raise_for_status()
             logger.info("ollama.warmup_complete", model=self.model)
         except Exception as e:
             logger.error("ollama.warmup_failed", model=self.model, error=str(e))
-        finally:
-            await warmup_client.aclose()
 
     async def close(self):
         """Close the HTTP client."""
         await self._client.aclose()
+
+
+class ParallelOllamaClient(OllamaClient):
+    """
+    OllamaClient that caps this process's in-flight generate() calls at
+    `max_parallel`. Each Uvicorn worker has its own client, so the Ollama
+    service's OLLAMA_NUM_PARALLEL slots are split across workers. Calls
+    beyond the cap wait here, before their request and its timeout start.
+    Each call frees its slot as soon as its own response completes, and a
+    cancelled caller drops its request.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        timeout: int = 30,
+        keep_alive: str = "24h",
+        max_parallel: int = 4,
+    ):
+        super().__init__(base_url, model, timeout, keep_alive)
+        self.max_parallel = max(1, max_parallel)
+        self._slots = asyncio.Semaphore(self.max_parallel)
+
+    async def generate(self, system_prompt: str, user_prompt: str) -> str:
+        """Wait for a free request slot, then send the prompt."""
+        async with self._slots:
+            return await super().generate(system_prompt, user_prompt)
@@ -6,19 +6,23 @@ Orchestrates the full email analysis pipeline: pre-filter → baseline lookup 
 deviation scoring → LLM analysis → score aggregation → alert generation.
 """
 
+import re
 import time
-import json
 import asyncio
 from datetime import datetime, timezone
+from typing import Optional
 
+import orjson
 import structlog
 
 from .prefilter import PreFilter
 from .llm_client import OllamaClient, OllamaClientError
 from .prompt_builder import build_analysis_prompt, SYSTEM_PROMPT
 from .scorer import ScoreAggregator
+from .dimensions import Dimension, DIMENSION_NAMES, DIMENSION_WEIGHTS
 from .behavioral.baseline import BaselineEngine
 from .behavioral.deviation import DeviationScorer
+from .behavioral.features import extract_features
 from ..db.repositories.analysis_repo import AnalysisRepository
 from ..db.repositories.alert_repo import AlertRepository
 from ..db.repositories.baseline_repo import BaselineRepository
@@ -27,6 +31,63 @@ from ..schemas.analyze import AnalyzeRequest, AnalyzeResponse
 
 logger = structlog.get_logger(__name__)
 
+# Dimension keys every validated LLM response must carry, in Dimension order
+_EXPECTED_DIMS = DIMENSION_NAMES
+
+_VALID_ACTIONS = frozenset(("proceed", "verify", "block"))
+
+_DEVIATION_WEIGHT = DIMENSION_WEIGHTS[Dimension.SENDER_BEHAVIORAL_DEVIATION]
+
+# Prefilter signal -> (dimension, score) for rule-based fallback scoring
+_SIGNAL_TO_DIM = {
+    "urgency_language_detected": ("artificial_urgency", 40),
+    "authority_reference_detected": ("authority_impersonation", 45),
+    "fear_threat_language_detected": ("fear_threat_induction", 40),
+    "emotional_manipulation_detected": ("emotional_escalation", 35),
+    "spoofed_sender_pattern": ("authority_impersonation", 60),
+    "all_caps_subject": ("emotional_escalation", 20),
+    "suspicious_request_detected": ("unusual_action_requested", 50),
+}
+
+# Bodies are cut to this length before any scoring stage sees them. Larger
+# than the prompt builder's 4000-char cap so prefilter and baseline stats
+# still see well past what the LLM reads.
+MAX_BODY_CHARS = 16_384
+
+# Outermost {...} span, for responses with text around the JSON object
+_JSON_BLOCK_RE = re.compile(r"\{.*\}", re.S)
+
+
+def _parse_llm_json(raw: str):
+    """
+    Parse the LLM's JSON response.
+
+    The response is parsed directly first; only if that fails is the outermost
+    {...} span extracted (e.g. from preamble or code fences) and parsed.
+    Raises orjson.JSONDecodeError if neither parses.
+    """
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        match = _JSON_BLOCK_RE.search(raw)
+        if match is None:
+            raise
+        return orjson.loads(match.group(0))
+
+
+# (expires_at, hour) for _utc_hour
+_hour_cache = [0.0, 0]
+
+
+def _utc_hour() -> int:
+    """Return the current UTC hour, recomputed only when the hour rolls over."""
+    now = time.time()
+    if now >= _hour_cache[0]:
+        # POSIX time has no leap seconds, so UTC hours start on multiples of 3600
+        _hour_cache[0] = now - now % 3600 + 3600
+        _hour_cache[1] = datetime.fromtimestamp(now, timezone.utc).hour
+    return _hour_cache[1]
+
 
 class AnalysisPipeline:
     """
@@ -42,6 +103,7 @@ class AnalysisPipeline:
         alert_repo: AlertRepository,
         baseline_repo: BaselineRepository,
         ws_manager: WebSocketManager,
+        llm_skip_low_cutoff: float = 2.0,
     ):
         self.prefilter = PreFilter()
         self.llm = llm
@@ -51,6 +113,11 @@ class AnalysisPipeline:
         self.analysis_repo = analysis_repo
         self.alert_repo = alert_repo
         self.ws_manager = ws_manager
+        self.llm_skip_low_cutoff = llm_skip_low_cutoff
+        self.analyzed_count = 0
+        self.truncated_count = 0
+        # Strong references to fire-and-forget tasks until they finish
+        self._background_tasks: set[asyncio.Task] = set()
 
     async def run(self, request: AnalyzeRequest) -> AnalyzeResponse:
         """
@@ -71,63 +138,106 @@ class AnalysisPipeline:
             channel=request.channel,
         )
 
-        # Stage 1: Rule-based prefilter (no GPU, <5ms)
-        prefilter_result = self.prefilter.evaluate(
-            subject=request.subject,
-            body=request.body,
-            sender_email=request.sender_email,
-            received_at=request.received_at,
+        body = request.body[:MAX_BODY_CHARS]
+        self.analyzed_count += 1
+        if len(body) < len(request.body):
+            self.truncated_count += 1
+            logger.info(
+                "pipeline.body_truncated",
+                message_uid=request.message_uid,
+                body_chars=len(request.body),
+                truncation_rate=round(self.truncated_count / self.analyzed_count, 4),
+            )
+
+        # Stages 1 + 2 run concurrently: the rule-based prefilter (no GPU,
+        # <5ms) in a worker thread while the sender baseline is loaded
+        prefilter_result, baseline = await asyncio.gather(
+            asyncio.to_thread(
+                self.prefilter.evaluate,
+                subject=request.subject,
+                body=body,
+                sender_email=request.sender_email,
+                received_at=request.received_at,
+            ),
+            self.baseline_engine.get_baseline(
+                recipient_email=request.recipient_email,
+                sender_email=request.sender_email,
+            ),
         )
+        features = extract_features(body)
 
-        # Stage 2: Load sender behavioral baseline
-        baseline = await self.baseline_engine.get_baseline(
-            recipient_email=request.recipient_email,
-            sender_email=request.sender_email,
+        # Stage 10 (early): Update sender baseline asynchronously. This
+        # email's baseline has already been read, so the write can run
+        # during LLM inference instead of after it.
+        self._spawn(
+            self.baseline_engine.update_baseline(
+                recipient_email=request.recipient_email,
+                sender_email=request.sender_email,
+                body=body,
+                received_at=request.received_at,
+                features=features,
+            )
         )
 
         # Stage 3: Compute behavioral deviation scores
         deviation_context = self.deviation_scorer.score(
-            body=request.body,
+            body=body,
             received_at=request.received_at,
             baseline=baseline,
+            features=features,
         )
 
         # Add word count deviation info to baseline for prompt context
         if baseline is not None:
-            current_wc = len(request.body.split())
+            current_wc = features.word_count
             baseline_wc = baseline.get("avg_word_count", 0)
             if baseline_wc > 0:
                 deviation_pct = ((current_wc - baseline_wc) / baseline_wc) * 100
                 baseline["word_count_deviation"] = f"{deviation_pct:+.0f}%"
 
-        # Stage 4: Build prompt and call LLM
-        received_hour = (
-            request.received_at.hour
-            if request.received_at
-            else datetime.now(timezone.utc).hour
-        )
-
-        prompt = build_analysis_prompt(
-            email_body=request.body,
-            sender_email=request.sender_email,
-            sender_display_name=request.sender_display_name,
-            subject=request.subject,
-            received_hour=received_hour,
-            baseline=baseline,
-            prefilter_signals=prefilter_result.signals,
-        )
+        # Stage 4: Build prompt and call LLM, unless the rule-based signals
+        # are already conclusive on their own
+        skip_action = self._conclusive_action(prefilter_result, deviation_context, baseline)
+        if skip_action is not None:
+            logger.info(
+                "pipeline.llm_skipped",
+                message_uid=request.message_uid,
+                recommended_action=skip_action,
+            )
+            llm_data = self._fallback_scores(
+                prefilter_result,
+                explanation="Analysis based on rule-based pre-filter and sender baseline (LLM not required).",
+                recommended_action=skip_action,
+            )
+            llm_response_raw = None
+        else:
+            received_hour = (
+                request.received_at.hour
+                if request.received_at
+                else _utc_hour()
+            )
 
-        try:
-            llm_response_raw = await self.llm.generate(
-                system_prompt=SYSTEM_PROMPT,
-                user_prompt=prompt,
+            prompt = build_analysis_prompt(
+                email_body=body,
+                sender_email=request.sender_email,
+                sender_display_name=request.sender_display_name,
+                subject=request.subject,
+                received_hour=received_hour,
+                baseline=baseline,
+                prefilter_signals=prefilter_result.signals,
             )
-            llm_data = json.loads(llm_response_raw)
-        except (OllamaClientError, json.JSONDecodeError) as e:
-            logger.error("pipeline.llm_error", error=str(e), message_uid=request.message_uid)
-            # Fallback: use prefilter scores only
-            llm_data = self._fallback_scores(prefilter_result)
-            llm_response_raw = json.dumps(llm_data)
+
+            try:
+                llm_response_raw = await self.llm.generate(
+                    system_prompt=SYSTEM_PROMPT,
+                    user_prompt=prompt,
+                )
+                llm_data = _parse_llm_json(llm_response_raw)
+            except (OllamaClientError, orjson.JSONDecodeError) as e:
+                logger.error("pipeline.llm_error", error=str(e), message_uid=request.message_uid)
+                # Fallback: use prefilter scores only
+                llm_data = self._fallback_scores(prefilter_result)
+                llm_response_raw = None
 
         # Validate LLM response structure
         llm_data = self._validate_llm_response(llm_data)
@@ -149,33 +259,42 @@ class AnalysisPipeline:
 
         processing_ms = int((time.monotonic() - start_time) * 1000)
 
-        # Stage 7: Persist analysis record
-        analysis_id = await self.analysis_repo.insert(
-            message_uid=request.message_uid,
-            recipient_email=request.recipient_email,
-            sender_email=request.sender_email,
-            sender_display_name=request.sender_display_name,
-            subject=request.subject,
-            received_at=request.received_at,
-            channel=request.channel,
-            prefilter_triggered=prefilter_result.triggered,
-            prefilter_signals=prefilter_result.signals,
-            manipulation_score=aggregate_score,
-            dimension_scores=final_scores,
-            explanation=llm_data.get("explanation", ""),
-            recommended_action=llm_data.get("recommended_action", "proceed"),
-            llm_raw_response=llm_response_raw,
-            processing_time_ms=processing_ms,
-        )
-
-        # Stage 8: Create alert if above threshold
-        if aggregate_score >= 35:
-            alert_id = await self.alert_repo.insert(
-                analysis_id=analysis_id,
-                severity=severity,
+        # Stages 7 + 8: Persist the analysis record and, above the alert
+        # threshold, its alert in one transaction
+        alert_id = None
+        async with self.analysis_repo.session_factory() as session:
+            analysis_id = await self.analysis_repo.insert(
+                message_uid=request.message_uid,
+                recipient_email=request.recipient_email,
+                sender_email=request.sender_email,
+                sender_display_name=request.sender_display_name,
+                subject=request.subject,
+                received_at=request.received_at,
+                channel=request.channel,
+                prefilter_triggered=prefilter_result.triggered,
+                prefilter_signals=prefilter_result.signals,
+                manipulation_score=aggregate_score,
+                dimension_scores=final_scores,
+                explanation=llm_data.get("explanation", ""),
+                recommended_action=llm_data.get("recommended_action", "proceed"),
+                llm_raw_response=llm_response_raw,
+                # Synthesized results are serialized once, by the repository
+                llm_raw_response_obj=llm_data if llm_response_raw is None else None,
+                processing_time_ms=processing_ms,
+                session=session,
             )
-            # Stage 9: Push real-time alert to dashboard
-            await self.ws_manager.broadcast({
+            if aggregate_score >= 35:
+                alert_id = await self.alert_repo.insert(
+                    analysis_id=analysis_id,
+                    severity=severity,
+                    session=session,
+                )
+            await session.commit()
+
+        if alert_id is not None:
+            # Stage 9: Push real-time alert to dashboard. The response does
+            # not depend on the fan-out, so it runs in the background.
+            self._spawn(self.ws_manager.broadcast({
                 "event": "new_alert",
                 "alert_id": alert_id,
                 "analysis_id": analysis_id,
@@ -187,17 +306,7 @@ class AnalysisPipeline:
                 "explanation": llm_data.get("explanation", ""),
                 "recommended_action": llm_data.get("recommended_action", "proceed"),
                 "dimension_scores": final_scores,
-            })
-
-        # Stage 10: Update sender baseline asynchronously
-        asyncio.create_task(
-            self.baseline_engine.update_baseline(
-                recipient_email=request.recipient_email,
-                sender_email=request.sender_email,
-                body=request.body,
-                received_at=request.received_at,
-            )
-        )
+            }))
 
         logger.info(
             "pipeline.complete",
@@ -218,6 +327,12 @@ class AnalysisPipeline:
             processing_time_ms=processing_ms,
         )
 
+    def _spawn(self, coro) -> None:
+        """Run a coroutine as a background task, keeping it referenced until done."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
     @staticmethod
     def _severity(score: float) -> str:
         """Determine alert severity from aggregate manipulation score."""
@@ -229,79 +344,73 @@ class AnalysisPipeline:
             return "medium"
         return "low"
 
+    def _conclusive_action(self, prefilter_result, deviation_context, baseline) -> Optional[str]:
+        """
+        Return the action to take without LLM inference, or None to run it.
+
+        An email with no prefilter signals from an established sender
+        proceeds when its weighted behavioral deviation (plus the prefilter
+        boost) is below the low cutoff. New senders always go to the LLM
+        since their deviation score carries no signal. There is no block
+        shortcut: the boost plus weighted deviation tops out around 74, so
+        every suspicious email gets an LLM verdict and explanation.
+        """
+        pre_aggregate = (
+            prefilter_result.score_boost
+            + deviation_context.deviation_score * _DEVIATION_WEIGHT
+        )
+        if (
+            pre_aggregate < self.llm_skip_low_cutoff
+            and not prefilter_result.triggered
+            and baseline is not None
+            and baseline.get("sample_count", 0) >= DeviationScorer.MIN_SAMPLES
+        ):
+            return "proceed"
+        return None
+
     @staticmethod
     def _validate_llm_response(llm_data: dict) -> dict:
         """Validate and sanitize LLM response structure."""
-        if "dimension_scores" not in llm_data:
-            llm_data["dimension_scores"] = {}
+        scores = llm_data.get("dimension_scores") or {}
+        llm_data["dimension_scores"] = scores
 
         # Ensure all dimension keys exist
-        expected_dims = [
-            "artificial_urgency", "authority_impersonation", "fear_threat_induction",
-            "reciprocity_exploitation", "scarcity_tactics", "social_proof_manipulation",
-            "sender_behavioral_deviation", "cross_channel_coordination",
-            "emotional_escalation", "request_context_mismatch",
-            "unusual_action_requested", "timing_anomaly",
-        ]
-        for dim in expected_dims:
-            if dim not in llm_data["dimension_scores"]:
-                llm_data["dimension_scores"][dim] = 0.0
-            else:
-                try:
-                    llm_data["dimension_scores"][dim] = float(llm_data["dimension_scores"][dim])
-                except (ValueError, TypeError):
-                    llm_data["dimension_scores"][dim] = 0.0
+        for dim in _EXPECTED_DIMS:
+            try:
+                scores[dim] = float(scores.get(dim, 0.0))
+            except (ValueError, TypeError):
+                scores[dim] = 0.0
 
         # Validate other fields
-        if "explanation" not in llm_data:
-            llm_data["explanation"] = "Analysis completed."
-        if "recommended_action" not in llm_data:
-            llm_data["recommended_action"] = "proceed"
-        if llm_data["recommended_action"] not in ("proceed", "verify", "block"):
+        llm_data.setdefault("explanation", "Analysis completed.")
+        action = llm_data.setdefault("recommended_action", "proceed")
+        if not isinstance(action, str) or action not in _VALID_ACTIONS:
             llm_data["recommended_action"] = "verify"
 
         return llm_data
 
     @staticmethod
-    def _fallback_scores(prefilter_result) -> dict:
-        """Generate fallback scores when LLM is unavailable."""
-        scores = {
-            "artificial_urgency": 0,
-            "authority_impersonation": 0,
-            "fear_threat_induction": 0,
-            "reciprocity_exploitation": 0,
-            "scarcity_tactics": 0,
-            "social_proof_manipulation": 0,
-            "sender_behavioral_deviation": 0,
-            "cross_channel_coordination": 0,
-            "emotional_escalation": 0,
-            "request_context_mismatch": 0,
-            "unusual_action_requested": 0,
-            "timing_anomaly": 0,
-        }
-
-        # Map prefilter signals to dimension scores
-        signal_mapping = {
-            "urgency_language_detected": ("artificial_urgency", 40),
-            "authority_reference_detected": ("authority_impersonation", 45),
-            "fear_threat_language_detected": ("fear_threat_induction", 40),
-            "emotional_manipulation_detected": ("emotional_escalation", 35),
-            "spoofed_sender_pattern": ("authority_impersonation", 60),
-            "all_caps_subject": ("emotional_escalation", 20),
-        }
+    def _fallback_scores(
+        prefilter_result,
+        explanation: str = "Analysis based on rule-based pre-filter (LLM unavailable).",
+        recommended_action: Optional[str] = None,
+    ) -> dict:
+        """Generate rule-based scores when the LLM is unavailable or skipped."""
+        scores = dict.fromkeys(_EXPECTED_DIMS, 0)
 
         for signal in prefilter_result.signals:
-            # Handle parameterized signals
-            base_signal = signal.split("(")[0]
-            if base_signal in signal_mapping:
-                dim, value = signal_mapping[base_signal]
-                scores[dim] = max(scores[dim], value)
-            elif base_signal == "suspicious_request_detected":
-                scores["unusual_action_requested"] = 50
+            # Parameterized signals look like "name(args)"
+            base_signal, _, _ = signal.partition("(")
+            entry = _SIGNAL_TO_DIM.get(base_signal)
+            if entry is not None:
+                dim, value = entry
+                if value > scores[dim]:
+                    scores[dim] = value
 
         return {
             "dimension_scores": scores,
-            "explanation": "Analysis based on rule-based pre-filter (LLM unavailable).",
-            "recommended_action": "verify" if prefilter_result.triggered else "proceed",
+            "explanation": explanation,
+            "recommended_action": recommended_action
+            or ("verify" if prefilter_result.triggered else "proceed"),
             "confidence": 30,
         }
@@ -13,6 +13,11 @@ from typing import Optional
 
 import structlog
 
+try:  # Optional multi-pattern SIMD scanner; the re path is used without it
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
 logger = structlog.get_logger(__name__)
 
 
@@ -24,6 +29,45 @@ class PreFilterResult:
     score_boost: float = 0.0
 
 
+def _collect_match_id(pattern_id: int, start: int, end: int, flags: int, context: set) -> None:
+    """Hyperscan match callback: record which pattern matched."""
+    context.add(pattern_id)
+
+
+def _compile_hyperscan(expressions: list[str]):
+    """Build a block-mode Hyperscan database for the content patterns, if available."""
+    if hyperscan is None:
+        return None
+    flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH
+    try:
+        db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        db.compile(
+            expressions=[e.encode() for e in expressions],
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=[flags] * len(expressions),
+        )
+    except hyperscan.error as e:
+        logger.warning("prefilter.hyperscan_unavailable", error=str(e))
+        return None
+    return db
+
+
+def _match_content(text: str) -> set[str]:
+    """Return the names of all content patterns that match anywhere in `text`."""
+    # Hyperscan's \s, \w and \b are ASCII-only (and \b is unsupported in its
+    # Unicode mode), so text like "wire\xa0transfer" takes the re path
+    if _CONTENT_DB is not None and text.isascii():
+        ids: set[int] = set()
+        _CONTENT_DB.scan(
+            text.encode("ascii"),
+            match_event_handler=_collect_match_id,
+            context=ids,
+        )
+        return {_CONTENT_NAMES[i] for i in ids}
+    return {m.lastgroup for m in _CONTENT_RE.finditer(text)}
+
+
 class PreFilter:
     """
     Rule-based pre-filter engine.
@@ -88,72 +132,57 @@ class PreFilter:
         Evaluate email content against rule-based filters.
         Returns signals detected and whether the prefilter was triggered.
         """
-        result = PreFilterResult()
+        signals: list[str] = []
+        append = signals.append
+        score_boost = 0.0
         combined_text = f"{subject} {body}"
 
-        # Check urgency
-        for pattern in self.URGENCY_PATTERNS:
-            if pattern.search(combined_text):
-                result.signals.append("urgency_language_detected")
-                result.score_boost += 5.0
-                break
-
-        # Check authority impersonation
-        for pattern in self.AUTHORITY_PATTERNS:
-            if pattern.search(combined_text):
-                result.signals.append("authority_reference_detected")
-                result.score_boost += 8.0
-                break
-
-        # Check fear/threat language
-        for pattern in self.FEAR_PATTERNS:
-            if pattern.search(combined_text):
-                result.signals.append("fear_threat_language_detected")
-                result.score_boost += 7.0
-                break
-
-        # Check suspicious requests
-        suspicious_count = 0
-        for pattern in self.SUSPICIOUS_REQUEST_PATTERNS:
-            if pattern.search(combined_text):
-                suspicious_count += 1
-        if suspicious_count > 0:
-            result.signals.append(f"suspicious_request_detected(count={suspicious_count})")
-            result.score_boost += min(suspicious_count * 5.0, 20.0)
-
-        # Check emotional manipulation
-        for pattern in self.EMOTIONAL_PATTERNS:
-            if pattern.search(combined_text):
-                result.signals.append("emotional_manipulation_detected")
-                result.score_boost += 4.0
-                break
+        # Count distinct matching patterns per category in a single scan
+        hits: dict[str, int] = {}
+        for name in _match_content(combined_text):
+            category = _CONTENT_CATEGORIES[name]
+            hits[category] = hits.get(category, 0) + 1
+
+        # Content categories, in signal order
+        for category, signal, boost, max_boost in _CATEGORY_META:
+            count = hits.get(category)
+            if not count:
+                continue
+            if max_boost is None:
+                append(signal)
+                score_boost += boost
+            else:
+                append(f"{signal}(count={count})")
+                score_boost += min(count * boost, max_boost)
 
         # Check spoofed sender
-        for pattern in self.SPOOFED_SENDER_PATTERNS:
-            if pattern.search(sender_email):
-                result.signals.append("spoofed_sender_pattern")
-                result.score_boost += 10.0
-                break
+        if _SPOOFED_RE.search(sender_email):
+            append("spoofed_sender_pattern")
+            score_boost += 10.0
 
         # Check for timing anomaly (emails sent at unusual hours)
         if received_at is not None:
             hour = received_at.hour
             if hour < 5 or hour > 23:
-                result.signals.append(f"unusual_send_hour({hour})")
-                result.score_boost += 3.0
+                append(f"unusual_send_hour({hour})")
+                score_boost += 3.0
 
         # Check for all-caps subject (shouting)
-        if subject and len(subject) > 5 and subject == subject.upper():
-            result.signals.append("all_caps_subject")
-            result.score_boost += 3.0
+        if subject and len(subject) > 5 and subject.isupper():
+            append("all_caps_subject")
+            score_boost += 3.0
 
         # Check for excessive exclamation/question marks
         exclamation_count = combined_text.count("!")
         if exclamation_count > 3:
-            result.signals.append(f"excessive_exclamation_marks({exclamation_count})")
-            result.score_boost += 2.0
+            append(f"excessive_exclamation_marks({exclamation_count})")
+            score_boost += 2.0
 
-        result.triggered = len(result.signals) > 0
+        result = PreFilterResult(
+            triggered=len(signals) > 0,
+            signals=signals,
+            score_boost=score_boost,
+        )
 
         if result.triggered:
             logger.info(
@@ -164,3 +193,50 @@ class PreFilter:
             )
 
         return result
+
+
+# Pattern tables are compiled once at import time and shared by every
+# PreFilter instance.
+#
+# All content patterns are merged into one alternation so the text is
+# scanned once. Each pattern gets a named group "<category>_<index>" and the
+# lookahead reports a match at every start position, so every pattern that
+# matches anywhere is seen. No two patterns can match at the same start (the
+# only shared leading word, "legal", diverges on the next word), so none
+# shadows another. Every pattern opens with \b and a letter, so only word
+# starts are tried.
+_NAMED_CONTENT_PATTERNS = [
+    (f"{category}_{i}", pattern.pattern)
+    for category, patterns in (
+        ("urgency", PreFilter.URGENCY_PATTERNS),
+        ("authority", PreFilter.AUTHORITY_PATTERNS),
+        ("fear", PreFilter.FEAR_PATTERNS),
+        ("suspicious", PreFilter.SUSPICIOUS_REQUEST_PATTERNS),
+        ("emotional", PreFilter.EMOTIONAL_PATTERNS),
+    )
+    for i, pattern in enumerate(patterns)
+]
+_CONTENT_NAMES = tuple(name for name, _ in _NAMED_CONTENT_PATTERNS)
+_CONTENT_CATEGORIES = {name: name.rpartition("_")[0] for name in _CONTENT_NAMES}
+_CONTENT_RE = re.compile(
+    r"(?=\w)\b(?=" + "|".join(f"(?P<{name}>{body})" for name, body in _NAMED_CONTENT_PATTERNS) + ")",
+    re.IGNORECASE,
+)
+_CONTENT_DB = _compile_hyperscan([body for _, body in _NAMED_CONTENT_PATTERNS])
+
+_SPOOFED_RE = re.compile(
+    "|".join(f"(?:{pattern.pattern})" for pattern in PreFilter.SPOOFED_SENDER_PATTERNS),
+    re.IGNORECASE,
+)
+
+# (category, signal, boost, max_boost) for each content category, in the
+# order signals are reported. Categories with a max_boost score every
+# matching pattern up to that cap and report the count in the signal;
+# the rest add a flat boost once.
+_CATEGORY_META: tuple[tuple[str, str, float, Optional[float]], ...] = (
+    ("urgency", "urgency_language_detected", 5.0, None),
+    ("authority", "authority_reference_detected", 8.0, None),
+    ("fear", "fear_threat_language_detected", 7.0, None),
+    ("suspicious", "suspicious_request_detected", 5.0, 20.0),
+    ("emotional", "emotional_manipulation_detected", 4.0, None),
+)
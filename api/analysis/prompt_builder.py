@@ -124,6 +124,38 @@ malformed output.
 """.strip()
 
 
+# Prompt sections that don't depend on the email are module constants;
+# build_analysis_prompt joins them with the per-email values. The layout
+# follows the fine-tune's training prompt (finetune/prepare_dataset.py).
+# Scoring rules and the JSON schema live only in SYSTEM_PROMPT, which
+# Ollama keeps cached as a prompt prefix, so the per-email prompt carries
+# data and a one-line instruction.
+_NO_BASELINE_CONTEXT = """SENDER BASELINE: none (first observed email from this sender)
+
+"""
+
+_PREFILTER_HEAD = """PRE-FILTER SIGNALS (rule-based, may be false positives):
+"""
+
+_PROMPT_HEAD = """Analyze the following email for psychological manipulation tactics.
+
+"""
+
+_METADATA_HEAD = """EMAIL METADATA:
+- Sender: """
+
+_BODY_HEAD = """
+
+EMAIL BODY:
+---
+"""
+
+_STATIC_TAIL = """
+---
+
+Respond ONLY with a JSON object."""
+
+
 def build_analysis_prompt(
     email_body: str,
     sender_email: str,
@@ -150,55 +182,41 @@ def build_analysis_prompt(
     Returns:
         Formatted prompt string for the LLM.
     """
-    baseline_context = ""
     if baseline:
-        baseline_context = f"""
-## Sender Behavioral Baseline
-Historical communication pattern observed for {sender_email}:
-- Average word count per email      : {baseline['avg_word_count']:.0f} words
-- Average sentence length           : {baseline['avg_sentence_length']:.1f} words/sentence
-- Typical send hours (UTC)          : {baseline['typical_hours']}
-- Formality score (0=casual, 1=formal): {baseline['formality_score']:.2f}
-- This email's send hour (UTC)      : {received_hour}
-- Word count deviation from baseline: {baseline.get('word_count_deviation', 'N/A')}
-
-Use this baseline to score sender_behavioral_deviation and timing_anomaly
-relative to the sender's established patterns. Absence of deviation is
-evidence against manipulation; strong deviation is corroborating evidence for it.
+        # An f-string compiles its format specs; str.format() re-parses the
+        # template on every call
+        baseline_context = f"""SENDER BASELINE ({sender_email}):
+- Avg word count: {baseline['avg_word_count']:.0f}
+- Avg sentence length: {baseline['avg_sentence_length']:.1f}
+- Typical send hours (UTC): {baseline['typical_hours']}
+- Formality (0=casual, 1=formal): {baseline['formality_score']:.2f}
+- Word count deviation: {baseline.get('word_count_deviation', 'N/A')}
+
 """
     else:
-        baseline_context = """
-## Sender Behavioral Baseline
-No historical baseline exists for this sender. Set sender_behavioral_deviation
-and timing_anomaly scores to 0. Do not infer deviation without prior data.
-"""
+        baseline_context = _NO_BASELINE_CONTEXT
 
     prefilter_context = ""
     if prefilter_signals:
-        prefilter_context = f"""
-## Rule-Based Pre-Filter Signals (triggered before LLM analysis)
-The following patterns were flagged by the fast rule-based filter:
-  {chr(10).join(f"  — {s}" for s in prefilter_signals)}
-
-These signals are corroborating evidence. Weight them in your scoring
-but do not treat them as conclusive — they may produce false positives.
-"""
-
-    return f"""
-Analyze the following inbound business email for psychological manipulation tactics.
-Produce only the JSON output defined in your system prompt. No other output.
-
-{prefilter_context}
-{baseline_context}
-## Email Metadata
-- Sender        : {sender_display_name} <{sender_email}>
-- Subject       : {subject}
-- Received (UTC): hour {received_hour}
-
-## Email Body
-─────────────────────────────────────────────────────────────
-{email_body[:4000]}
-─────────────────────────────────────────────────────────────
-
-Score all 12 manipulation dimensions. Emit the JSON output contract.
-""".strip()
\ No newline at end of file
+        prefilter_context = "".join((
+            _PREFILTER_HEAD,
+            "".join(["- " + s + "\n" for s in prefilter_signals]),
+            "\n",
+        ))
+
+    return "".join((
+        _PROMPT_HEAD,
+        prefilter_context,
+        baseline_context,
+        _METADATA_HEAD,
+        sender_display_name,
+        " <",
+        sender_email,
+        ">\n- Subject: ",
+        subject,
+        "\n- Received (UTC): hour ",
+        str(received_hour),
+        _BODY_HEAD,
+        email_body[:4000],
+        _STATIC_TAIL,
+    ))
@@ -9,10 +9,13 @@ and computes a weighted aggregate manipulation score.
 import structlog
 from typing import Dict
 
-from .dimensions import Dimension, DIMENSION_WEIGHTS
+from .dimensions import Dimension, DIMENSION_NAMES, DIMENSION_WEIGHT_PAIRS
 
 logger = structlog.get_logger(__name__)
 
+# Resolved once; Enum .value is a descriptor lookup on every access
+_DEVIATION_KEY = Dimension.SENDER_BEHAVIORAL_DEVIATION.value
+
 
 class ScoreAggregator:
     """
@@ -39,17 +42,18 @@ class ScoreAggregator:
         """
         final_scores: Dict[str, float] = {}
 
-        for dim_name in self.VALID_DIMENSIONS:
-            raw_score = llm_dimension_scores.get(dim_name, 0.0)
-            # Clamp to valid range
-            final_scores[dim_name] = max(0.0, min(100.0, float(raw_score)))
+        for dim_name in DIMENSION_NAMES:
+            score = float(llm_dimension_scores.get(dim_name, 0.0))
+            # Clamp to valid range; same results as max(0.0, min(100.0, score))
+            # without the two builtin calls
+            score = score if score < 100.0 else 100.0
+            final_scores[dim_name] = score if score > 0.0 else 0.0
 
         # Override sender_behavioral_deviation with computed value if available
         if behavioral_deviation_score is not None and behavioral_deviation_score > 0:
             # Weighted blend: 60% behavioral engine, 40% LLM assessment
-            llm_deviation = final_scores.get(Dimension.SENDER_BEHAVIORAL_DEVIATION.value, 0.0)
-            blended = (behavioral_deviation_score * 0.6) + (llm_deviation * 0.4)
-            final_scores[Dimension.SENDER_BEHAVIORAL_DEVIATION.value] = min(100.0, blended)
+            blended = (behavioral_deviation_score * 0.6) + (final_scores[_DEVIATION_KEY] * 0.4)
+            final_scores[_DEVIATION_KEY] = blended if blended < 100.0 else 100.0
 
         return final_scores
 
@@ -66,12 +70,11 @@ class ScoreAggregator:
         Returns:
             Weighted aggregate score (0-100).
         """
+        # A plain loop; sum() over a generator costs a frame resume per item
+        get = dimension_scores.get
         aggregate = 0.0
-
-        for dimension in Dimension:
-            score = dimension_scores.get(dimension.value, 0.0)
-            weight = DIMENSION_WEIGHTS.get(dimension, 0.0)
-            aggregate += score * weight
+        for name, weight in DIMENSION_WEIGHT_PAIRS:
+            aggregate += get(name, 0.0) * weight
 
         # Clamp to 0-100
         aggregate = max(0.0, min(100.0, aggregate))
@@ -32,12 +32,18 @@ class Settings(BaseSettings):
     ollama_base_url: str = "http://ollama:11434"
     ollama_model: str = "qwen3:8b"
     ollama_timeout_seconds: int = 120
+    ollama_num_parallel: int = 4
+    ollama_keep_alive: str = "24h"
 
     # Alert Thresholds
     alert_medium_threshold: float = 35.0
     alert_high_threshold: float = 60.0
     alert_critical_threshold: float = 80.0
 
+    # LLM short-circuit: skip inference for established senders when prefilter
+    # boost plus weighted behavioral deviation is already below this cutoff
+    llm_skip_low_cutoff: float = 2.0
+
     # Pipeline Weights
     prefilter_score_boost: float = 15.0
     behavioral_weight: float = 0.6
@@ -10,9 +10,10 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from .config import get_settings
-from ..db.database import create_engine_and_session, run_migrations
-from ..analysis.llm_client import OllamaClient
+from ..db.database import create_engine_and_session, run_migrations, warm_pool
+from ..analysis.llm_client import ParallelOllamaClient
 from ..analysis.pipeline import AnalysisPipeline
+from ..analysis.prompt_builder import SYSTEM_PROMPT
 from ..db.repositories.analysis_repo import AnalysisRepository
 from ..db.repositories.alert_repo import AlertRepository
 from ..db.repositories.baseline_repo import BaselineRepository
@@ -33,12 +34,16 @@ async def lifespan(app: FastAPI):
     # Initialize database engine and session factory
     engine, session_factory = await create_engine_and_session(settings.database_url)
     await run_migrations(engine)
+    await warm_pool(engine)
 
-    # Initialize Ollama LLM client
-    llm_client = OllamaClient(
+    # Initialize Ollama LLM client. Its cap on in-flight calls is per
+    # process, so OLLAMA_NUM_PARALLEL is shared out across the workers.
+    llm_client = ParallelOllamaClient(
         base_url=settings.ollama_base_url,
         model=settings.ollama_model,
         timeout=settings.ollama_timeout_seconds,
+        keep_alive=settings.ollama_keep_alive,
+        max_parallel=max(1, settings.ollama_num_parallel // max(1, settings.workers)),
     )
 
     # Initialize WebSocket manager
@@ -80,6 +85,7 @@ async def lifespan(app: FastAPI):
         alert_repo=alert_repo,
         baseline_repo=baseline_repo,
         ws_manager=ws_manager,
+        llm_skip_low_cutoff=settings.llm_skip_low_cutoff,
     )
 
     # Store in app state for dependency injection
@@ -98,8 +104,9 @@ async def lifespan(app: FastAPI):
     # Ensure LLM model is available (auto-pull if missing)
     await llm_client.ensure_model()
 
-    # Warm up the model (loads into VRAM so first request is fast)
-    await llm_client.warmup()
+    # Warm up the model (loads into VRAM and prefills the system prompt
+    # so the first request is fast)
+    await llm_client.warmup(system_prompt=SYSTEM_PROMPT)
 
     logger.info("mindwall.ready", ollama_url=settings.ollama_base_url, model=settings.ollama_model)
 
@@ -8,6 +8,7 @@ Configures structlog for JSON-formatted structured logging.
 import logging
 import sys
 
+import orjson
 import structlog
 
 
@@ -21,19 +22,28 @@ def configure_logging(log_level: str = "INFO") -> None:
         level=getattr(logging, log_level.upper(), logging.INFO),
     )
 
-    structlog.configure(
-        processors=[
-            structlog.contextvars.merge_contextvars,
-            structlog.processors.add_log_level,
+    processors = [
+        structlog.contextvars.merge_contextvars,
+        structlog.processors.add_log_level,
+    ]
+    if log_level.upper() == "DEBUG":
+        # Stack and exception introspection only when debugging
+        processors += [
             structlog.processors.StackInfoRenderer(),
             structlog.dev.set_exc_info,
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.processors.JSONRenderer(),
-        ],
+        ]
+    processors += [
+        structlog.processors.TimeStamper(fmt="iso"),
+        structlog.processors.JSONRenderer(serializer=orjson.dumps),
+    ]
+
+    structlog.configure(
+        processors=processors,
         wrapper_class=structlog.make_filtering_bound_logger(
             getattr(logging, log_level.upper(), logging.INFO)
         ),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
+        # orjson renders bytes, written straight to stdout's buffer
+        logger_factory=structlog.BytesLoggerFactory(),
         cache_logger_on_first_use=True,
     )
@@ -5,9 +5,13 @@ Developed by Pradyumn Tandon (https://pradyumntandon.com) at VRIP7 (https://vrip
 SQLAlchemy async engine with aiosqlite for zero-dependency persistent storage.
 """
 
+import asyncio
+import json
 import os
-from typing import Tuple
+from contextlib import AsyncExitStack
+from typing import Any, Tuple
 
+import orjson
 import structlog
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -15,10 +19,25 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy import text
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from .models import DIMENSION_COLUMNS
 
 logger = structlog.get_logger(__name__)
 
+# Applied to every new SQLite connection. WAL lets dashboard reads run
+# alongside analysis writes, and synchronous=NORMAL is durable in WAL mode
+# with one fsync per checkpoint instead of per commit.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA foreign_keys=ON",
+)
+
 # Schema DDL for database initialization
 SCHEMA_DDL = """
 CREATE TABLE IF NOT EXISTS employees (
@@ -37,7 +56,7 @@ CREATE TABLE IF NOT EXISTS sender_baselines (
     sender_email        TEXT NOT NULL,
     avg_word_count      REAL,
     avg_sentence_length REAL,
-    typical_hours       TEXT,
+    typical_hours       INTEGER DEFAULT 0,
     formality_score     REAL,
     typical_requests    TEXT,
     sample_count        INTEGER DEFAULT 0,
@@ -59,6 +78,18 @@ CREATE TABLE IF NOT EXISTS analyses (
     prefilter_signals       TEXT,
     manipulation_score      REAL,
     dimension_scores        TEXT,
+    dim_artificial_urgency              REAL,
+    dim_authority_impersonation         REAL,
+    dim_fear_threat_induction           REAL,
+    dim_reciprocity_exploitation        REAL,
+    dim_scarcity_tactics                REAL,
+    dim_social_proof_manipulation       REAL,
+    dim_sender_behavioral_deviation     REAL,
+    dim_cross_channel_coordination      REAL,
+    dim_emotional_escalation            REAL,
+    dim_request_context_mismatch        REAL,
+    dim_unusual_action_requested        REAL,
+    dim_timing_anomaly                  REAL,
     explanation             TEXT,
     recommended_action      TEXT,
     llm_raw_response        TEXT,
@@ -78,8 +109,13 @@ CREATE TABLE IF NOT EXISTS alerts (
 
 CREATE INDEX IF NOT EXISTS idx_analyses_recipient ON analyses(recipient_email, analyzed_at DESC);
 CREATE INDEX IF NOT EXISTS idx_analyses_score ON analyses(manipulation_score DESC);
+CREATE INDEX IF NOT EXISTS idx_analyses_pair ON analyses(recipient_email, sender_email, analyzed_at);
+CREATE INDEX IF NOT EXISTS idx_analyses_analyzed ON analyses(analyzed_at DESC);
 CREATE INDEX IF NOT EXISTS idx_alerts_severity ON alerts(severity, acknowledged, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_alerts_created ON alerts(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_alerts_unack ON alerts(severity) WHERE acknowledged = 0;
 CREATE INDEX IF NOT EXISTS idx_baselines_lookup ON sender_baselines(recipient_email, sender_email);
+CREATE INDEX IF NOT EXISTS idx_employees_risk ON employees(risk_score DESC);
 
 CREATE TABLE IF NOT EXISTS email_accounts (
     id              INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -105,6 +141,30 @@ CREATE TABLE IF NOT EXISTS system_settings (
 """
 
 
+SQLITE_ANALYZE = "PRAGMA analysis_limit=400; ANALYZE;"
+
+
+def _json_serializer(value: Any) -> str:
+    """Serialize JSON columns with orjson."""
+    return orjson.dumps(value).decode()
+
+
+def _json_deserializer(value: str) -> Any:
+    """
+    Parse JSON columns with orjson. Falls back to json for values orjson
+    rejects (json.dumps writes NaN/Infinity), and reads unparseable values
+    as None rather than failing the whole query.
+    """
+    try:
+        return orjson.loads(value)
+    except orjson.JSONDecodeError:
+        pass
+    try:
+        return json.loads(value)
+    except ValueError:
+        return None
+
+
 async def create_engine_and_session(
     database_url: str,
 ) -> Tuple[AsyncEngine, async_sessionmaker[AsyncSession]]:
@@ -124,13 +184,41 @@ async def create_engine_and_session(
         if db_dir:
             os.makedirs(db_dir, exist_ok=True)
 
+    engine_kwargs = {"pool_pre_ping": True}
+    if "sqlite" in database_url:
+        # busy timeout (seconds): concurrent writers wait for the WAL write
+        # lock instead of failing with "database is locked"
+        engine_kwargs["connect_args"] = {"check_same_thread": False, "timeout": 30}
+        # A local file connection can't be dropped by a server, so the
+        # per-checkout liveness ping is a wasted round-trip
+        engine_kwargs["pool_pre_ping"] = False
+    if ":memory:" not in database_url:
+        # aiosqlite file databases default to NullPool, which opens (and
+        # re-applies the pragmas to) a new connection for every session.
+        # Under WAL, pooled readers don't block each other or the writer.
+        engine_kwargs.update(
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=8,
+            max_overflow=16,
+            pool_recycle=3600,
+        )
+
     engine = create_async_engine(
         database_url,
         echo=False,
-        pool_pre_ping=True,
-        connect_args={"check_same_thread": False} if "sqlite" in database_url else {},
+        json_serializer=_json_serializer,
+        json_deserializer=_json_deserializer,
+        **engine_kwargs,
     )
 
+    if "sqlite" in database_url:
+        @event.listens_for(engine.sync_engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in SQLITE_PRAGMAS:
+                cursor.execute(pragma)
+            cursor.close()
+
     session_factory = async_sessionmaker(
         engine,
         class_=AsyncSession,
@@ -141,6 +229,24 @@ async def create_engine_and_session(
     return engine, session_factory
 
 
+async def warm_pool(engine: AsyncEngine) -> None:
+    """
+    Open the pool's base connections up front so the first concurrent
+    requests check out ready connections instead of each connecting and
+    applying the pragmas.
+    """
+    size = getattr(engine.pool, "size", None)
+    if not callable(size):
+        return
+
+    count = size()
+    async with AsyncExitStack() as stack:
+        await asyncio.gather(
+            *(stack.enter_async_context(engine.connect()) for _ in range(count))
+        )
+    logger.info("database.pool_warmed", connections=count)
+
+
 async def run_migrations(engine: AsyncEngine) -> None:
     """
     Run database schema migrations (create tables if they don't exist).
@@ -148,10 +254,75 @@ async def run_migrations(engine: AsyncEngine) -> None:
     Args:
         engine: The async SQLAlchemy engine.
     """
-    async with engine.begin() as conn:
-        for statement in SCHEMA_DDL.strip().split(";"):
-            statement = statement.strip()
-            if statement:
-                await conn.execute(text(statement))
+    async with engine.connect() as conn:
+        # Run the whole schema as one script, in one transaction, on the
+        # aiosqlite connection instead of splitting it on ";" and executing
+        # statement by statement
+        raw_connection = await conn.get_raw_connection()
+        await raw_connection.driver_connection.executescript(f"BEGIN;\n{SCHEMA_DDL}\nCOMMIT;")
+        await _add_dimension_columns(raw_connection.driver_connection)
+        await _convert_legacy_typical_hours(raw_connection.driver_connection)
+        # Refresh planner statistics (sampled, so cheap on large tables).
+        # Without them SQLite won't prefer the partial idx_alerts_unack
+        # over the wider idx_alerts_severity.
+        await raw_connection.driver_connection.executescript(SQLITE_ANALYZE)
 
     logger.info("database.migrations_complete")
+
+
+async def _add_dimension_columns(connection) -> None:
+    """
+    Add the per-dimension score columns to an analyses table created before
+    they existed, backfilled from the dimension_scores JSON.
+    """
+    cursor = await connection.execute("PRAGMA table_info(analyses)")
+    existing = {row[1] for row in await cursor.fetchall()}
+    missing = [name for name in DIMENSION_COLUMNS if name not in existing]
+    if not missing:
+        return
+
+    statements = [f"ALTER TABLE analyses ADD COLUMN {name} REAL;" for name in missing]
+    # Only numeric JSON values are copied, as the dashboard averages skip the rest
+    assignments = ", ".join(
+        f"{name} = CASE WHEN json_type(dimension_scores, '$.{name[4:]}') IN ('integer', 'real') "
+        f"THEN json_extract(dimension_scores, '$.{name[4:]}') END"
+        for name in missing
+    )
+    statements.append(
+        f"UPDATE analyses SET {assignments} WHERE json_valid(dimension_scores);"
+    )
+    await connection.executescript("BEGIN;\n" + "\n".join(statements) + "\nCOMMIT;")
+    logger.info("database.dimension_columns_added", columns=len(missing))
+
+
+async def _convert_legacy_typical_hours(connection) -> None:
+    """
+    Rewrite typical_hours values still stored as a JSON list of hours
+    (e.g. "[9, 14]") as the 24-bit mask the baseline upsert ORs into.
+    SQLite would read such text as 0 in that OR and drop the learned hours.
+    """
+    cursor = await connection.execute(
+        "SELECT COUNT(*) FROM sender_baselines "
+        "WHERE typeof(typical_hours) = 'text' AND typical_hours LIKE '[%'"
+    )
+    (legacy_rows,) = await cursor.fetchone()
+    if not legacy_rows:
+        return
+
+    # Same rules as hours_to_mask: integer hours 0-23 set their bit, and
+    # a value that isn't valid JSON reads as an empty mask
+    await connection.executescript("""
+BEGIN;
+UPDATE sender_baselines
+SET typical_hours = (
+    SELECT COALESCE(SUM(DISTINCT 1 << value), 0)
+    FROM json_each(sender_baselines.typical_hours)
+    WHERE type = 'integer' AND value BETWEEN 0 AND 23
+)
+WHERE typeof(typical_hours) = 'text' AND typical_hours LIKE '[%' AND json_valid(typical_hours);
+UPDATE sender_baselines
+SET typical_hours = 0
+WHERE typeof(typical_hours) = 'text' AND typical_hours LIKE '[%';
+COMMIT;
+""")
+    logger.info("database.typical_hours_converted", rows=legacy_rows)
@@ -17,7 +17,7 @@ CREATE TABLE IF NOT EXISTS sender_baselines (
     sender_email        TEXT NOT NULL,
     avg_word_count      REAL,
     avg_sentence_length REAL,
-    typical_hours       TEXT,
+    typical_hours       INTEGER DEFAULT 0,
     formality_score     REAL,
     typical_requests    TEXT,
     sample_count        INTEGER DEFAULT 0,
@@ -39,6 +39,18 @@ CREATE TABLE IF NOT EXISTS analyses (
     prefilter_signals       TEXT,
     manipulation_score      REAL,
     dimension_scores        TEXT,
+    dim_artificial_urgency              REAL,
+    dim_authority_impersonation         REAL,
+    dim_fear_threat_induction           REAL,
+    dim_reciprocity_exploitation        REAL,
+    dim_scarcity_tactics                REAL,
+    dim_social_proof_manipulation       REAL,
+    dim_sender_behavioral_deviation     REAL,
+    dim_cross_channel_coordination      REAL,
+    dim_emotional_escalation            REAL,
+    dim_request_context_mismatch        REAL,
+    dim_unusual_action_requested        REAL,
+    dim_timing_anomaly                  REAL,
     explanation             TEXT,
     recommended_action      TEXT,
     llm_raw_response        TEXT,
@@ -58,8 +70,13 @@ CREATE TABLE IF NOT EXISTS alerts (
 
 CREATE INDEX IF NOT EXISTS idx_analyses_recipient ON analyses(recipient_email, analyzed_at DESC);
 CREATE INDEX IF NOT EXISTS idx_analyses_score ON analyses(manipulation_score DESC);
+CREATE INDEX IF NOT EXISTS idx_analyses_pair ON analyses(recipient_email, sender_email, analyzed_at);
+CREATE INDEX IF NOT EXISTS idx_analyses_analyzed ON analyses(analyzed_at DESC);
 CREATE INDEX IF NOT EXISTS idx_alerts_severity ON alerts(severity, acknowledged, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_alerts_created ON alerts(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_alerts_unack ON alerts(severity) WHERE acknowledged = 0;
 CREATE INDEX IF NOT EXISTS idx_baselines_lookup ON sender_baselines(recipient_email, sender_email);
+CREATE INDEX IF NOT EXISTS idx_employees_risk ON employees(risk_score DESC);
 
 CREATE TABLE IF NOT EXISTS email_accounts (
     id              INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -16,9 +16,12 @@ from sqlalchemy import (
     ForeignKey,
     Index,
     Integer,
+    JSON,
     String,
     Text,
     UniqueConstraint,
+    func,
+    text,
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -30,14 +33,17 @@ class Base(DeclarativeBase):
 
 class Employee(Base):
     __tablename__ = "employees"
+    __table_args__ = (
+        Index("idx_employees_risk", "risk_score"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     email: Mapped[str] = mapped_column(String, unique=True, nullable=False, index=True)
     display_name: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     department: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     risk_score: Mapped[float] = mapped_column(Float, default=0.0)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.current_timestamp())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.current_timestamp())
 
 
 class SenderBaseline(Base):
@@ -52,11 +58,11 @@ class SenderBaseline(Base):
     sender_email: Mapped[str] = mapped_column(String, nullable=False)
     avg_word_count: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     avg_sentence_length: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-    typical_hours: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    typical_hours: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     formality_score: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     typical_requests: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     sample_count: Mapped[int] = mapped_column(Integer, default=0)
-    last_updated: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    last_updated: Mapped[datetime] = mapped_column(DateTime, server_default=func.current_timestamp())
 
 
 class Analysis(Base):
@@ -65,6 +71,8 @@ class Analysis(Base):
         UniqueConstraint("message_uid", "recipient_email", name="uq_analysis_message"),
         Index("idx_analyses_recipient", "recipient_email", "analyzed_at"),
         Index("idx_analyses_score", "manipulation_score"),
+        Index("idx_analyses_pair", "recipient_email", "sender_email", "analyzed_at"),
+        Index("idx_analyses_analyzed", "analyzed_at"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -74,12 +82,25 @@ class Analysis(Base):
     sender_display_name: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     subject: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     received_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
-    analyzed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    analyzed_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.current_timestamp())
     channel: Mapped[str] = mapped_column(String, nullable=False)
     prefilter_triggered: Mapped[bool] = mapped_column(Boolean, default=False)
-    prefilter_signals: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    prefilter_signals: Mapped[Optional[list]] = mapped_column(JSON(none_as_null=True), nullable=True)
     manipulation_score: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-    dimension_scores: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    dimension_scores: Mapped[Optional[dict]] = mapped_column(JSON(none_as_null=True), nullable=True)
+    # Per-dimension copies of dimension_scores for SQL-side aggregation
+    dim_artificial_urgency: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    dim_authority_impersonation: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    dim_fear_threat_induction: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    dim_reciprocity_exploitation: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    dim_scarcity_tactics: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    dim_social_proof_manipulation: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    dim_sender_behavioral_deviation: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    dim_cross_channel_coordination: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    dim_emotional_escalation: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    dim_request_context_mismatch: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    dim_unusual_action_requested: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    dim_timing_anomaly: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     explanation: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     recommended_action: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     llm_raw_response: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -88,10 +109,18 @@ class Analysis(Base):
     alerts: Mapped[list["Alert"]] = relationship("Alert", back_populates="analysis")
 
 
+# Names of the per-dimension score columns on analyses, in dimension order
+DIMENSION_COLUMNS = tuple(
+    column.name for column in Analysis.__table__.columns if column.name.startswith("dim_")
+)
+
+
 class Alert(Base):
     __tablename__ = "alerts"
     __table_args__ = (
         Index("idx_alerts_severity", "severity", "acknowledged", "created_at"),
+        Index("idx_alerts_created", "created_at"),
+        Index("idx_alerts_unack", "severity", sqlite_where=text("acknowledged = 0")),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -100,7 +129,7 @@ class Alert(Base):
     acknowledged: Mapped[bool] = mapped_column(Boolean, default=False)
     acknowledged_by: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     acknowledged_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.current_timestamp())
 
     analysis: Mapped["Analysis"] = relationship("Analysis", back_populates="alerts")
 
@@ -119,8 +148,8 @@ class EmailAccount(Base):
     password: Mapped[str] = mapped_column(String, nullable=False)
     use_tls: Mapped[bool] = mapped_column(Boolean, default=True)
     enabled: Mapped[bool] = mapped_column(Boolean, default=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.current_timestamp())
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.current_timestamp())
 
 
 class SystemSetting(Base):
@@ -128,4 +157,4 @@ class SystemSetting(Base):
 
     key: Mapped[str] = mapped_column(String, primary_key=True)
     value: Mapped[str] = mapped_column(Text, nullable=False)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.current_timestamp())
@@ -5,43 +5,96 @@ Developed by Pradyumn Tandon (https://pradyumntandon.com) at VRIP7 (https://vrip
 Database repository for alert management.
 """
 
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy import select, func, desc, and_, update
+from sqlalchemy import select, func, desc, and_, insert, text, update
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload
 
 from ..models import Alert, Analysis
 
+# Fixed-shape aggregate, kept as literal SQL to skip expression compilation.
+# "acknowledged = 0" matches the idx_alerts_unack partial index predicate.
+_UNACKNOWLEDGED_COUNTS_SQL = text(
+    "SELECT severity, COUNT(*) FROM alerts WHERE acknowledged = 0 GROUP BY severity"
+)
+
+# Analysis fields shown in the alert list. The page skips the raw LLM
+# response and the score columns, which only the detail view needs.
+_SUMMARY_ANALYSIS_COLUMNS = (
+    Analysis.recipient_email,
+    Analysis.sender_email,
+    Analysis.subject,
+    Analysis.manipulation_score,
+    Analysis.explanation,
+    Analysis.recommended_action,
+)
+
 
 class AlertRepository:
     """Repository for managing alerts in the database."""
 
+    # Short-lived cache for alert detail lookups
+    CACHE_TTL_SECONDS = 1.0
+    CACHE_MAX_ENTRIES = 256
+
     def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
         self.session_factory = session_factory
+        self._cache: OrderedDict[int, Tuple[float, Alert]] = OrderedDict()
+
+    async def insert(
+        self,
+        analysis_id: int,
+        severity: str,
+        session: Optional[AsyncSession] = None,
+    ) -> int:
+        """
+        Create a new alert and return its ID.
+
+        If `session` is given, the alert is written in the caller's
+        transaction and the caller commits.
+        """
+        stmt = (
+            insert(Alert)
+            .values(analysis_id=analysis_id, severity=severity)
+            .returning(Alert.id)
+        )
+
+        if session is not None:
+            return (await session.execute(stmt)).scalar_one()
 
-    async def insert(self, analysis_id: int, severity: str) -> int:
-        """Create a new alert and return its ID."""
         async with self.session_factory() as session:
-            alert = Alert(
-                analysis_id=analysis_id,
-                severity=severity,
-            )
-            session.add(alert)
+            alert_id = (await session.execute(stmt)).scalar_one()
             await session.commit()
-            await session.refresh(alert)
-            return alert.id
+            return alert_id
 
     async def get_by_id(self, alert_id: int) -> Optional[Alert]:
-        """Get an alert by ID with its associated analysis."""
+        """
+        Get an alert by ID with its associated analysis.
+
+        Found alerts are cached for CACHE_TTL_SECONDS so repeated detail
+        lookups of the same alert share one load. The cached Alert is
+        shared between callers and must be treated as read-only.
+        """
+        now = time.monotonic()
+        cached = self._cache.get(alert_id)
+        if cached is not None and cached[0] > now:
+            self._cache.move_to_end(alert_id)
+            return cached[1]
+
         async with self.session_factory() as session:
-            result = await session.execute(
-                select(Alert)
-                .options(selectinload(Alert.analysis))
-                .where(Alert.id == alert_id)
+            alert = await session.get(
+                Alert, alert_id, options=[joinedload(Alert.analysis)]
             )
-            return result.scalar_one_or_none()
+
+        if alert is not None:
+            self._cache[alert_id] = (now + self.CACHE_TTL_SECONDS, alert)
+            self._cache.move_to_end(alert_id)
+            if len(self._cache) > self.CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+        return alert
 
     async def get_paginated(
         self,
@@ -52,8 +105,11 @@ class AlertRepository:
     ) -> Dict[str, Any]:
         """Get paginated alerts with optional filters."""
         async with self.session_factory() as session:
-            query = select(Alert).options(selectinload(Alert.analysis))
-            count_query = select(func.count(Alert.id))
+            # The total rides along on every page row as a window count and
+            # each alert's analysis is joined in, so a page is one query
+            query = select(Alert, func.count().over().label("total")).options(
+                joinedload(Alert.analysis).load_only(*_SUMMARY_ANALYSIS_COLUMNS)
+            )
 
             conditions = []
             if severity:
@@ -63,16 +119,23 @@ class AlertRepository:
 
             if conditions:
                 query = query.where(and_(*conditions))
-                count_query = count_query.where(and_(*conditions))
-
-            # Get total count
-            total_result = await session.execute(count_query)
-            total = total_result.scalar() or 0
 
-            # Get page
-            query = query.order_by(desc(Alert.created_at)).limit(limit).offset(offset)
-            result = await session.execute(query)
-            alerts = list(result.scalars().all())
+            # created_at has one-second resolution; id keeps same-second
+            # alerts in a stable order across pages
+            query = query.order_by(desc(Alert.created_at), desc(Alert.id)).limit(limit).offset(offset)
+            rows = (await session.execute(query)).all()
+            alerts = [row.Alert for row in rows]
+
+            if rows:
+                total = rows[0].total
+            elif offset > 0:
+                # Past the last page: no rows to carry the total
+                count_query = select(func.count()).select_from(Alert)
+                if conditions:
+                    count_query = count_query.where(and_(*conditions))
+                total = (await session.execute(count_query)).scalar() or 0
+            else:
+                total = 0
 
             return {
                 "items": alerts,
@@ -94,25 +157,21 @@ class AlertRepository:
                 .values(
                     acknowledged=True,
                     acknowledged_by=acknowledged_by,
-                    acknowledged_at=datetime.utcnow(),
+                    acknowledged_at=func.current_timestamp(),
                 )
                 .returning(Alert)
             )
-            await session.commit()
+            # RETURNING already carries every column, so the updated Alert
+            # needs no follow-up refresh SELECT
             row = result.scalar_one_or_none()
-            if row:
-                await session.refresh(row)
-            return row
+            await session.commit()
+        self._cache.pop(alert_id, None)
+        return row
 
     async def get_unacknowledged_count(self) -> Dict[str, int]:
         """Get count of unacknowledged alerts by severity."""
         async with self.session_factory() as session:
-            result = await session.execute(
-                select(Alert.severity, func.count(Alert.id))
-                .where(Alert.acknowledged == False)
-                .group_by(Alert.severity)
-            )
+            result = await session.execute(_UNACKNOWLEDGED_COUNTS_SQL)
             counts = {"low": 0, "medium": 0, "high": 0, "critical": 0}
-            for severity, count in result.all():
-                counts[severity] = count
+            counts.update(result.tuples().all())
             return counts
@@ -5,14 +5,20 @@ Developed by Pradyumn Tandon (https://pradyumntandon.com) at VRIP7 (https://vrip
 Database repository for analysis records.
 """
 
-import json
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy import select, func, desc, and_, case
+import orjson
+from sqlalchemy import select, func, desc, and_, case, distinct, insert
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from ..models import Analysis
+from ..models import DIMENSION_COLUMNS, Analysis
+
+# Rows fetched per batch when dashboard aggregates stream their inputs
+_STREAM_BATCH_ROWS = 1000
+
+# Window shown by the timeline when no date range is given
+_DEFAULT_TIMELINE_SPAN = timedelta(days=7)
 
 
 class AnalysisRepository:
@@ -36,12 +42,24 @@ class AnalysisRepository:
         dimension_scores: Dict[str, float],
         explanation: str,
         recommended_action: str,
-        llm_raw_response: str,
+        llm_raw_response: Optional[str],
         processing_time_ms: int,
+        llm_raw_response_obj: Optional[Dict[str, Any]] = None,
+        session: Optional[AsyncSession] = None,
     ) -> int:
-        """Insert a new analysis record and return its ID."""
-        async with self.session_factory() as session:
-            analysis = Analysis(
+        """
+        Insert a new analysis record and return its ID.
+
+        Pass the raw LLM output as `llm_raw_response`, or a response built
+        in-process as `llm_raw_response_obj` to have it serialized here.
+        If `session` is given, the record is written in the caller's
+        transaction and the caller commits.
+        """
+        if llm_raw_response_obj is not None:
+            llm_raw_response = orjson.dumps(llm_raw_response_obj).decode()
+        stmt = (
+            insert(Analysis)
+            .values(
                 message_uid=message_uid,
                 recipient_email=recipient_email,
                 sender_email=sender_email,
@@ -50,18 +68,25 @@ class AnalysisRepository:
                 received_at=received_at,
                 channel=channel,
                 prefilter_triggered=prefilter_triggered,
-                prefilter_signals=json.dumps(prefilter_signals),
+                prefilter_signals=prefilter_signals,
                 manipulation_score=manipulation_score,
-                dimension_scores=json.dumps(dimension_scores),
+                dimension_scores=dimension_scores,
                 explanation=explanation,
                 recommended_action=recommended_action,
                 llm_raw_response=llm_raw_response,
                 processing_time_ms=processing_time_ms,
+                **_dimension_columns(dimension_scores),
             )
-            session.add(analysis)
+            .returning(Analysis.id)
+        )
+
+        if session is not None:
+            return (await session.execute(stmt)).scalar_one()
+
+        async with self.session_factory() as session:
+            analysis_id = (await session.execute(stmt)).scalar_one()
             await session.commit()
-            await session.refresh(analysis)
-            return analysis.id
+            return analysis_id
 
     async def get_by_id(self, analysis_id: int) -> Optional[Analysis]:
         """Get an analysis by its ID."""
@@ -92,6 +117,56 @@ class AnalysisRepository:
             )
             return list(result.scalars().all())
 
+    async def get_coordination_stats(
+        self,
+        recipient_email: str,
+        sender_email: str,
+        since: datetime,
+    ) -> Dict[str, Any]:
+        """
+        Aggregate recent sender-to-recipient analyses in a single query.
+
+        Returns the distinct channels used, the number of analyses, and the
+        earliest and latest non-null manipulation scores since `since`.
+        """
+        window = and_(
+            Analysis.recipient_email == recipient_email,
+            Analysis.sender_email == sender_email,
+            Analysis.analyzed_at >= since,
+        )
+        scored = and_(window, Analysis.manipulation_score.is_not(None))
+        first_score = (
+            select(Analysis.manipulation_score)
+            .where(scored)
+            .order_by(Analysis.analyzed_at.asc(), Analysis.id.asc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        last_score = (
+            select(Analysis.manipulation_score)
+            .where(scored)
+            .order_by(Analysis.analyzed_at.desc(), Analysis.id.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(
+                    func.count().label("count"),
+                    func.group_concat(distinct(Analysis.channel)).label("channels"),
+                    first_score.label("first_score"),
+                    last_score.label("last_score"),
+                ).where(window)
+            )
+            row = result.one()
+            return {
+                "channels": [c for c in row.channels.split(",") if c] if row.channels else [],
+                "count": row.count or 0,
+                "first_score": row.first_score,
+                "last_score": row.last_score,
+            }
+
     async def get_timeline(
         self,
         start_date: Optional[datetime] = None,
@@ -114,44 +189,26 @@ class AnalysisRepository:
 
     async def get_summary_stats(self) -> Dict[str, Any]:
         """Get aggregate statistics for the dashboard."""
+        # One scan computes every figure; FILTER gives the conditional counts
+        stmt = select(
+            func.count(),
+            func.avg(Analysis.manipulation_score),
+            func.count().filter(Analysis.manipulation_score >= 60),
+            func.count().filter(Analysis.manipulation_score >= 80),
+            func.avg(Analysis.processing_time_ms),
+        )
         async with self.session_factory() as session:
-            # Total analyses
-            total_result = await session.execute(
-                select(func.count(Analysis.id))
-            )
-            total_count = total_result.scalar() or 0
-
-            # Average score
-            avg_result = await session.execute(
-                select(func.avg(Analysis.manipulation_score))
-            )
-            avg_score = avg_result.scalar() or 0.0
-
-            # High risk count (score >= 60)
-            high_risk_result = await session.execute(
-                select(func.count(Analysis.id)).where(Analysis.manipulation_score >= 60)
-            )
-            high_risk_count = high_risk_result.scalar() or 0
-
-            # Critical count (score >= 80)
-            critical_result = await session.execute(
-                select(func.count(Analysis.id)).where(Analysis.manipulation_score >= 80)
-            )
-            critical_count = critical_result.scalar() or 0
-
-            # Average processing time
-            avg_time_result = await session.execute(
-                select(func.avg(Analysis.processing_time_ms))
-            )
-            avg_processing_ms = avg_time_result.scalar() or 0
-
-            return {
-                "total_analyses": total_count,
-                "average_score": round(float(avg_score), 2),
-                "high_risk_count": high_risk_count,
-                "critical_count": critical_count,
-                "average_processing_ms": round(float(avg_processing_ms), 0),
-            }
+            total_count, avg_score, high_risk_count, critical_count, avg_processing_ms = (
+                await session.execute(stmt)
+            ).one()
+
+        return {
+            "total_analyses": total_count or 0,
+            "average_score": round(float(avg_score or 0.0), 2),
+            "high_risk_count": high_risk_count or 0,
+            "critical_count": critical_count or 0,
+            "average_processing_ms": round(float(avg_processing_ms or 0), 0),
+        }
 
     async def get_email_counts_by_recipients(
         self,
@@ -165,7 +222,7 @@ class AnalysisRepository:
             result = await session.execute(
                 select(
                     Analysis.recipient_email,
-                    func.count(Analysis.id).label("total"),
+                    func.count().label("total"),
                     func.sum(
                         case(
                             (Analysis.manipulation_score >= 35, 1),
@@ -195,41 +252,33 @@ class AnalysisRepository:
             result = await session.execute(
                 select(Analysis)
                 .where(Analysis.recipient_email == recipient_email)
-                .order_by(desc(Analysis.analyzed_at))
+                .order_by(desc(Analysis.analyzed_at), desc(Analysis.id))
                 .limit(limit)
                 .offset(offset)
             )
             return list(result.scalars().all())
 
     async def get_avg_dimension_scores(self) -> Dict[str, float]:
-        """Compute average dimension scores across all analyses."""
+        """Compute average dimension scores across the latest 500 analyses."""
+        latest = (
+            select(*(getattr(Analysis, name) for name in DIMENSION_COLUMNS))
+            .where(Analysis.dimension_scores.isnot(None))
+            .order_by(desc(Analysis.analyzed_at))
+            .limit(500)
+            .subquery()
+        )
         async with self.session_factory() as session:
             result = await session.execute(
-                select(Analysis.dimension_scores)
-                .where(Analysis.dimension_scores.isnot(None))
-                .order_by(desc(Analysis.analyzed_at))
-                .limit(500)
+                select(*(func.avg(latest.c[name]) for name in DIMENSION_COLUMNS))
             )
-            rows = result.scalars().all()
-
-        if not rows:
-            return {}
-
-        totals: Dict[str, float] = {}
-        counts: Dict[str, int] = {}
-        for raw in rows:
-            try:
-                scores = json.loads(raw) if isinstance(raw, str) else raw
-            except (json.JSONDecodeError, TypeError):
-                continue
-            if not isinstance(scores, dict):
-                continue
-            for key, val in scores.items():
-                if isinstance(val, (int, float)):
-                    totals[key] = totals.get(key, 0.0) + float(val)
-                    counts[key] = counts.get(key, 0) + 1
+            averages = result.one()
 
-        return {k: round(totals[k] / counts[k], 2) for k in totals if counts.get(k, 0) > 0}
+        # AVG skips NULLs and is NULL for a dimension with no scores at all
+        return {
+            name[4:]: round(avg, 2)
+            for name, avg in zip(DIMENSION_COLUMNS, averages)
+            if avg is not None
+        }
 
     async def get_heatmap_data(
         self,
@@ -237,13 +286,15 @@ class AnalysisRepository:
         max_employees: int = 10,
     ) -> Dict[str, Any]:
         """Build employee × day heatmap of average manipulation scores."""
-        since = datetime.utcnow() - timedelta(days=days)
+        # One clock read so the filter, day buckets and labels agree
+        now = datetime.utcnow()
+        since = now - timedelta(days=days)
         async with self.session_factory() as session:
             # Top recipients by volume
             top_result = await session.execute(
                 select(
                     Analysis.recipient_email,
-                    func.count(Analysis.id).label("cnt"),
+                    func.count().label("cnt"),
                 )
                 .where(Analysis.analyzed_at >= since)
                 .group_by(Analysis.recipient_email)
@@ -255,22 +306,39 @@ class AnalysisRepository:
             if not top_emails:
                 return {"data": [], "row_labels": [], "col_labels": []}
 
-            result = await session.execute(
-                select(Analysis)
+            # Only the three columns the grid needs, streamed and folded
+            # into per-cell sums instead of loading full Analysis rows
+            result = await session.stream(
+                select(
+                    Analysis.recipient_email,
+                    Analysis.analyzed_at,
+                    Analysis.manipulation_score,
+                )
                 .where(
                     and_(
                         Analysis.analyzed_at >= since,
                         Analysis.recipient_email.in_(top_emails),
+                        Analysis.manipulation_score.isnot(None),
                     )
                 )
+                .execution_options(yield_per=_STREAM_BATCH_ROWS)
             )
-            analyses = list(result.scalars().all())
+            first_day = (now - timedelta(days=days - 1)).date()
+            sums: Dict[Tuple[str, int], float] = {}
+            counts: Dict[Tuple[str, int], int] = {}
+            async for recipient_email, analyzed_at, score in result:
+                if not analyzed_at:
+                    continue
+                day = (analyzed_at.date() - first_day).days
+                if 0 <= day < days:
+                    key = (recipient_email, day)
+                    sums[key] = sums.get(key, 0.0) + score
+                    counts[key] = counts.get(key, 0) + 1
 
         # Build day labels
-        col_labels = []
-        for i in range(days):
-            d = datetime.utcnow() - timedelta(days=days - 1 - i)
-            col_labels.append(d.strftime("%b %d"))
+        col_labels = [
+            (first_day + timedelta(days=i)).strftime("%b %d") for i in range(days)
+        ]
 
         # Build grid
         row_labels = top_emails
@@ -278,19 +346,8 @@ class AnalysisRepository:
         for email in row_labels:
             row: List[Optional[float]] = []
             for i in range(days):
-                day_start = (datetime.utcnow() - timedelta(days=days - 1 - i)).replace(
-                    hour=0, minute=0, second=0, microsecond=0
-                )
-                day_end = day_start + timedelta(days=1)
-                scores = [
-                    a.manipulation_score
-                    for a in analyses
-                    if a.recipient_email == email
-                    and a.manipulation_score is not None
-                    and a.analyzed_at
-                    and day_start <= a.analyzed_at < day_end
-                ]
-                row.append(round(sum(scores) / len(scores), 1) if scores else None)
+                count = counts.get((email, i))
+                row.append(round(sums[(email, i)] / count, 1) if count else None)
             grid.append(row)
 
         return {"data": grid, "row_labels": row_labels, "col_labels": col_labels}
@@ -302,14 +359,22 @@ class AnalysisRepository:
         bucket_count: int = 20,
     ) -> List[Dict[str, Any]]:
         """Return aggregated time-bucket entries for the threat timeline chart."""
-        if not start_date:
-            start_date = datetime.utcnow() - timedelta(days=7)
-        if not end_date:
-            end_date = datetime.utcnow()
+        if not start_date or not end_date:
+            now = datetime.utcnow()
+            start_date = start_date or now - _DEFAULT_TIMELINE_SPAN
+            end_date = end_date or now
 
+        # Compute bucket boundaries
+        total_seconds = (end_date - start_date).total_seconds()
+        bucket_seconds = max(total_seconds / bucket_count, 1)
+
+        # Only timestamp and score are needed; rows are streamed and folded
+        # into per-bucket sums instead of loading full Analysis rows
+        sums = [0.0] * bucket_count
+        counts = [0] * bucket_count
         async with self.session_factory() as session:
-            result = await session.execute(
-                select(Analysis)
+            result = await session.stream(
+                select(Analysis.analyzed_at, Analysis.manipulation_score)
                 .where(
                     and_(
                         Analysis.analyzed_at >= start_date,
@@ -318,30 +383,34 @@ class AnalysisRepository:
                     )
                 )
                 .order_by(Analysis.analyzed_at)
+                .execution_options(yield_per=_STREAM_BATCH_ROWS)
             )
-            analyses = list(result.scalars().all())
+            async for analyzed_at, score in result:
+                idx = int((analyzed_at - start_date).total_seconds() / bucket_seconds)
+                idx = min(idx, bucket_count - 1)
+                sums[idx] += score
+                counts[idx] += 1
 
-        if not analyses:
+        if not any(counts):
             return []
 
-        # Compute bucket boundaries
-        total_seconds = (end_date - start_date).total_seconds()
-        bucket_seconds = max(total_seconds / bucket_count, 1)
-
-        buckets: Dict[int, List[float]] = {}
-        for a in analyses:
-            idx = int((a.analyzed_at - start_date).total_seconds() / bucket_seconds)
-            idx = min(idx, bucket_count - 1)
-            buckets.setdefault(idx, []).append(a.manipulation_score)
-
         entries = []
         for i in range(bucket_count):
             bucket_time = start_date + timedelta(seconds=i * bucket_seconds)
-            scores = buckets.get(i, [])
+            count = counts[i]
             entries.append({
                 "bucket": bucket_time,
-                "avg_score": round(sum(scores) / len(scores), 2) if scores else 0.0,
-                "count": len(scores),
+                "avg_score": round(sums[i] / count, 2) if count else 0.0,
+                "count": count,
             })
 
         return entries
+
+
+def _dimension_columns(dimension_scores: Dict[str, float]) -> Dict[str, Optional[float]]:
+    """Map dimension scores onto the analyses dim_* columns."""
+    columns = {}
+    for name in DIMENSION_COLUMNS:
+        value = dimension_scores.get(name[4:])
+        columns[name] = float(value) if isinstance(value, (int, float)) else None
+    return columns
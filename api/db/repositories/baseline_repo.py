@@ -5,10 +5,10 @@ Developed by Pradyumn Tandon (https://pradyumntandon.com) at VRIP7 (https://vrip
 Database repository for sender behavioral baselines.
 """
 
-from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from ..models import SenderBaseline
@@ -43,42 +43,80 @@ class BaselineRepository:
         sender_email: str,
         avg_word_count: float,
         avg_sentence_length: float,
-        typical_hours: str,
+        typical_hours: int,
         formality_score: float,
         sample_count: int,
     ) -> None:
-        """Insert or update a sender behavioral baseline."""
+        """Insert or update a sender behavioral baseline in a single statement."""
+        values = {
+            "avg_word_count": avg_word_count,
+            "avg_sentence_length": avg_sentence_length,
+            "typical_hours": typical_hours,
+            "formality_score": formality_score,
+            "sample_count": sample_count,
+        }
+        stmt = sqlite_insert(SenderBaseline).values(
+            recipient_email=recipient_email,
+            sender_email=sender_email,
+            **values,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SenderBaseline.recipient_email, SenderBaseline.sender_email],
+            set_={**values, "last_updated": func.current_timestamp()},
+        )
+
         async with self.session_factory() as session:
-            existing = await session.execute(
-                select(SenderBaseline).where(
-                    and_(
-                        SenderBaseline.recipient_email == recipient_email,
-                        SenderBaseline.sender_email == sender_email,
-                    )
-                )
-            )
-            baseline = existing.scalar_one_or_none()
+            await session.execute(stmt)
+            await session.commit()
 
-            if baseline:
-                baseline.avg_word_count = avg_word_count
-                baseline.avg_sentence_length = avg_sentence_length
-                baseline.typical_hours = typical_hours
-                baseline.formality_score = formality_score
-                baseline.sample_count = sample_count
-                baseline.last_updated = datetime.utcnow()
-            else:
-                baseline = SenderBaseline(
-                    recipient_email=recipient_email,
-                    sender_email=sender_email,
-                    avg_word_count=avg_word_count,
-                    avg_sentence_length=avg_sentence_length,
-                    typical_hours=typical_hours,
-                    formality_score=formality_score,
-                    sample_count=sample_count,
-                )
-                session.add(baseline)
+    async def upsert_baseline_with_ema(
+        self,
+        recipient_email: str,
+        sender_email: str,
+        word_count: float,
+        avg_sentence_length: float,
+        formality_score: float,
+        send_hour: Optional[int],
+        alpha: float,
+    ) -> int:
+        """
+        Fold one email's metrics into the sender baseline in a single statement.
 
+        Creates the baseline from the email's metrics if none exists, otherwise
+        applies the exponential moving average in SQL and sets the send-hour
+        bit in the typical_hours mask. Returns the resulting sample count.
+        """
+        hour_bit = (1 << send_hour) if send_hour is not None else 0
+        stmt = sqlite_insert(SenderBaseline).values(
+            recipient_email=recipient_email,
+            sender_email=sender_email,
+            avg_word_count=float(word_count),
+            avg_sentence_length=avg_sentence_length,
+            typical_hours=hour_bit,
+            formality_score=formality_score,
+            sample_count=1,
+        )
+        new = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SenderBaseline.recipient_email, SenderBaseline.sender_email],
+            set_={
+                "avg_word_count": alpha * new.avg_word_count
+                + (1 - alpha) * func.coalesce(SenderBaseline.avg_word_count, 0.0),
+                "avg_sentence_length": alpha * new.avg_sentence_length
+                + (1 - alpha) * func.coalesce(SenderBaseline.avg_sentence_length, 0.0),
+                "formality_score": alpha * new.formality_score
+                + (1 - alpha) * func.coalesce(SenderBaseline.formality_score, 0.5),
+                "typical_hours": func.coalesce(SenderBaseline.typical_hours, 0).op("|")(new.typical_hours),
+                "sample_count": func.coalesce(SenderBaseline.sample_count, 0) + 1,
+                "last_updated": func.current_timestamp(),
+            },
+        ).returning(SenderBaseline.sample_count)
+
+        async with self.session_factory() as session:
+            result = await session.execute(stmt)
+            sample_count = result.scalar_one()
             await session.commit()
+            return sample_count
 
     async def get_baselines_for_recipient(
         self,
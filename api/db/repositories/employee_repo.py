@@ -5,20 +5,78 @@ Developed by Pradyumn Tandon (https://pradyumntandon.com) at VRIP7 (https://vrip
 Database repository for employee management and risk tracking.
 """
 
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import asyncio
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy import select, func, desc, update
+import structlog
+from sqlalchemy import select, func, desc, and_, insert, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import load_only
 
 from ..models import Employee, Analysis
 
+logger = structlog.get_logger(__name__)
+
+# Only analyses this recent count toward the rolling risk score
+_RISK_WINDOW = timedelta(days=30)
+
+# Analysis fields shown in a risk profile's recent list. The raw LLM
+# response and the per-dimension columns stay unloaded.
+_RECENT_ANALYSIS_COLUMNS = (
+    Analysis.sender_email,
+    Analysis.subject,
+    Analysis.manipulation_score,
+    Analysis.channel,
+    Analysis.analyzed_at,
+    Analysis.explanation,
+    Analysis.recommended_action,
+    Analysis.dimension_scores,
+)
+
 
 class EmployeeRepository:
     """Repository for managing employee records and risk profiles."""
 
+    # Bound on the in-process set of emails known to have a record
+    KNOWN_MAX_ENTRIES = 10_000
+
     def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
         self.session_factory = session_factory
+        self._known: OrderedDict[str, None] = OrderedDict()
+        self._background_tasks: set[asyncio.Task] = set()
+
+    def ensure_exists(self, email: str) -> None:
+        """
+        Make sure an employee record exists without waiting on the database.
+
+        Emails already seen by this process return immediately. Otherwise
+        get_or_create runs as a background task; its insert is
+        ON CONFLICT DO NOTHING, so a repeated create is harmless.
+        """
+        if email in self._known:
+            self._known.move_to_end(email)
+            return
+        self._remember(email)
+        task = asyncio.create_task(self._create_in_background(email))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _create_in_background(self, email: str) -> None:
+        try:
+            await self.get_or_create(email=email, display_name=None)
+        except Exception as e:
+            # Forget the email so the next request retries the create
+            self._known.pop(email, None)
+            logger.error("employee.create_failed", email=email, error=str(e))
+
+    def _remember(self, email: str) -> None:
+        self._known[email] = None
+        self._known.move_to_end(email)
+        if len(self._known) > self.KNOWN_MAX_ENTRIES:
+            self._known.popitem(last=False)
 
     async def get_or_create(self, email: str, display_name: Optional[str] = None) -> Employee:
         """Get an employee by email, or create if not exists."""
@@ -27,22 +85,33 @@ class EmployeeRepository:
                 select(Employee).where(Employee.email == email)
             )
             employee = result.scalar_one_or_none()
+            if employee is not None:
+                self._remember(email)
+                return employee
+
+            # RETURNING hands back the new row, server defaults included.
+            # DO NOTHING covers a concurrent create; that row is re-read.
+            result = await session.execute(
+                sqlite_insert(Employee)
+                .values(email=email, display_name=display_name)
+                .on_conflict_do_nothing(index_elements=[Employee.email])
+                .returning(Employee)
+            )
+            employee = result.scalar_one_or_none()
+            await session.commit()
 
             if employee is None:
-                employee = Employee(
-                    email=email,
-                    display_name=display_name,
+                result = await session.execute(
+                    select(Employee).where(Employee.email == email)
                 )
-                session.add(employee)
-                await session.commit()
-                await session.refresh(employee)
-
+                employee = result.scalar_one()
+            self._remember(email)
             return employee
 
     async def get_count(self) -> int:
         """Return the total number of monitored employees."""
         async with self.session_factory() as session:
-            result = await session.execute(select(func.count(Employee.id)))
+            result = await session.execute(select(func.count()).select_from(Employee))
             return result.scalar() or 0
 
     async def get_all(
@@ -53,7 +122,7 @@ class EmployeeRepository:
     ) -> Dict[str, Any]:
         """Get paginated employee list."""
         async with self.session_factory() as session:
-            count_result = await session.execute(select(func.count(Employee.id)))
+            count_result = await session.execute(select(func.count()).select_from(Employee))
             total = count_result.scalar() or 0
 
             query = select(Employee)
@@ -79,80 +148,112 @@ class EmployeeRepository:
             await session.execute(
                 update(Employee)
                 .where(Employee.email == email)
-                .values(risk_score=round(risk_score, 2), updated_at=datetime.utcnow())
+                .values(risk_score=round(risk_score, 2), updated_at=func.current_timestamp())
             )
             await session.commit()
 
     async def get_risk_profile(self, email: str) -> Optional[Dict[str, Any]]:
         """Get full risk profile for an employee including recent analyses."""
+        # None of the four reads needs another's result
+        employee, (total_analyses, rolling_risk), recent_analyses, top_senders = await asyncio.gather(
+            self._fetch_employee(email),
+            self._fetch_rolling_risk(email),
+            self._fetch_recent_analyses(email),
+            self._fetch_top_senders(email),
+        )
+        if not employee:
+            return None
+
+        # The stored score has two decimals; viewing an employee whose score
+        # hasn't moved shouldn't cost an UPDATE and a WAL commit
+        risk_score = round(rolling_risk, 2)
+        if employee.risk_score != risk_score:
+            await self.update_risk_score(email, risk_score)
+            employee.risk_score = risk_score
+
+        return {
+            "employee": employee,
+            "rolling_risk_score": round(rolling_risk, 2),
+            "total_analyses": total_analyses,
+            "recent_analyses": recent_analyses,
+            "top_threat_senders": top_senders,
+        }
+
+    async def _fetch_employee(self, email: str) -> Optional[Employee]:
+        """Load an employee by email."""
         async with self.session_factory() as session:
-            # Get employee
-            emp_result = await session.execute(
+            result = await session.execute(
                 select(Employee).where(Employee.email == email)
             )
-            employee = emp_result.scalar_one_or_none()
-            if not employee:
-                return None
+            return result.scalar_one_or_none()
 
-            # Get recent analyses targeting this employee
-            analyses_result = await session.execute(
+    async def _fetch_rolling_risk(self, email: str) -> Tuple[int, float]:
+        """
+        Return (analysis count, rolling 30-day risk) over the recipient's
+        latest 50 analyses. Higher scores weigh more (score^1.5).
+        """
+        thirty_days_ago = datetime.utcnow() - _RISK_WINDOW
+        latest = (
+            select(Analysis.manipulation_score, Analysis.analyzed_at)
+            .where(Analysis.recipient_email == email)
+            .order_by(desc(Analysis.analyzed_at))
+            .limit(50)
+            .subquery()
+        )
+        in_window = and_(
+            latest.c.manipulation_score.is_not(None),
+            latest.c.analyzed_at >= thirty_days_ago,
+        )
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(
+                    func.count(),
+                    func.count().filter(in_window),
+                    func.sum(func.pow(latest.c.manipulation_score, 1.5)).filter(in_window),
+                )
+            )
+            total_analyses, scored_count, weighted_sum = result.one()
+
+        rolling_risk = 0.0
+        if scored_count:
+            rolling_risk = min(100.0, weighted_sum / (scored_count * (100 ** 0.5)))
+        return total_analyses, rolling_risk
+
+    async def _fetch_recent_analyses(self, email: str) -> List[Analysis]:
+        """Load the ten most recent analyses targeting an employee."""
+        async with self.session_factory() as session:
+            result = await session.execute(
                 select(Analysis)
+                .options(load_only(*_RECENT_ANALYSIS_COLUMNS))
                 .where(Analysis.recipient_email == email)
                 .order_by(desc(Analysis.analyzed_at))
-                .limit(50)
+                .limit(10)
             )
-            recent_analyses = list(analyses_result.scalars().all())
-
-            # Compute rolling 30-day risk score
-            import json
-            from datetime import timedelta
-            thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-            recent_scores = [
-                a.manipulation_score
-                for a in recent_analyses
-                if a.manipulation_score is not None and a.analyzed_at and a.analyzed_at >= thirty_days_ago
-            ]
+            return list(result.scalars().all())
 
-            rolling_risk = 0.0
-            if recent_scores:
-                # Weighted: higher scores have more influence
-                rolling_risk = sum(s ** 1.5 for s in recent_scores) / (len(recent_scores) * (100 ** 0.5))
-                rolling_risk = min(100.0, rolling_risk)
-
-            # Update employee risk score
-            employee.risk_score = round(rolling_risk, 2)
-            employee.updated_at = datetime.utcnow()
-            await session.commit()
-
-            # Get top senders by threat level
-            top_senders_result = await session.execute(
+    async def _fetch_top_senders(self, email: str) -> List[Dict[str, Any]]:
+        """Senders to an employee ranked by average manipulation score."""
+        async with self.session_factory() as session:
+            result = await session.execute(
                 select(
                     Analysis.sender_email,
                     func.avg(Analysis.manipulation_score).label("avg_score"),
-                    func.count(Analysis.id).label("count"),
+                    func.count().label("count"),
                 )
                 .where(Analysis.recipient_email == email)
                 .group_by(Analysis.sender_email)
                 .order_by(desc("avg_score"))
                 .limit(10)
             )
-            top_senders = [
+            return [
                 {
-                    "sender_email": row.sender_email,
-                    "avg_score": round(float(row.avg_score), 2),
-                    "count": row.count,
+                    "sender_email": sender_email,
+                    "avg_score": round(float(avg_score), 2),
+                    "count": count,
                 }
-                for row in top_senders_result.all()
+                for sender_email, avg_score, count in result.tuples()
             ]
 
-            return {
-                "employee": employee,
-                "rolling_risk_score": round(rolling_risk, 2),
-                "total_analyses": len(recent_analyses),
-                "recent_analyses": recent_analyses[:10],
-                "top_threat_senders": top_senders,
-            }
-
     async def create_employee(
         self,
         email: str,
@@ -161,14 +262,13 @@ class EmployeeRepository:
     ) -> Employee:
         """Create a new employee record."""
         async with self.session_factory() as session:
-            employee = Employee(
-                email=email,
-                display_name=display_name,
-                department=department,
+            result = await session.execute(
+                insert(Employee)
+                .values(email=email, display_name=display_name, department=department)
+                .returning(Employee)
             )
-            session.add(employee)
+            employee = result.scalar_one()
             await session.commit()
-            await session.refresh(employee)
             return employee
 
     async def delete_employee(self, employee_id: int) -> bool:
@@ -7,6 +7,7 @@ Application factory and entrypoint for the MindWall analysis API.
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from .core.config import get_settings
 from .core.lifespan import lifespan
@@ -28,6 +29,7 @@ def create_app() -> FastAPI:
         docs_url="/docs" if config.log_level == "DEBUG" else None,
         redoc_url=None,
         lifespan=lifespan,
+        default_response_class=ORJSONResponse,
     )
 
     # CORS — allow dashboard and extension origins
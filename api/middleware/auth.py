@@ -5,67 +5,83 @@ Developed by Pradyumn Tandon (https://pradyumntandon.com) at VRIP7 (https://vrip
 Validates the X-MindWall-Key header for all API requests from internal services.
 """
 
+import hmac
+
 import structlog
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 logger = structlog.get_logger(__name__)
 
 # Paths that do not require authentication
-PUBLIC_PATHS = {
+PUBLIC_PATHS = frozenset({
     "/health",
     "/auth/login",
     "/docs",
     "/openapi.json",
     "/favicon.ico",
-}
+})
 
 # WebSocket paths handled separately
-WEBSOCKET_PATHS = {
+WEBSOCKET_PATHS = frozenset({
     "/ws/alerts",
-}
+})
+
+# Every path that skips the key check, merged so a request is tested once
+_AUTH_EXEMPT_PATHS = PUBLIC_PATHS | WEBSOCKET_PATHS
 
+_API_KEY_HEADER = b"x-mindwall-key"
 
-class APIKeyAuthMiddleware(BaseHTTPMiddleware):
+
+class APIKeyAuthMiddleware:
     """
     Middleware that validates the X-MindWall-Key header against the
     configured API secret key. All internal services share this key.
-    """
 
-    def __init__(self, app, api_secret_key: str):
-        super().__init__(app)
-        self.api_secret_key = api_secret_key
+    Written as plain ASGI rather than BaseHTTPMiddleware, which runs each
+    request's downstream app in an extra task.
+    """
 
-    async def dispatch(self, request: Request, call_next):
-        path = request.url.path
+    def __init__(self, app: ASGIApp, api_secret_key: str):
+        self.app = app
+        self._key_bytes = api_secret_key.encode()
 
-        # Allow public paths without auth
-        if path in PUBLIC_PATHS:
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Only HTTP requests are checked; WebSocket auth is handled at the
+        # WebSocket level if needed
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        # Allow WebSocket upgrades (auth checked at WebSocket level if needed)
-        if path in WEBSOCKET_PATHS:
-            return await call_next(request)
+        path = scope["path"]
+        method = scope["method"]
 
-        # Allow CORS preflight
-        if request.method == "OPTIONS":
-            return await call_next(request)
+        # Allow public paths, WebSocket endpoints and CORS preflight
+        if path in _AUTH_EXEMPT_PATHS or method == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
 
         # Validate API key
-        api_key = request.headers.get("X-MindWall-Key")
+        api_key = None
+        for name, value in scope["headers"]:
+            if name == _API_KEY_HEADER:
+                api_key = value
+                break
+
         if not api_key:
-            logger.warning("auth.missing_key", path=path, method=request.method)
-            return JSONResponse(
+            logger.warning("auth.missing_key", path=path, method=method)
+            response = ORJSONResponse(
                 status_code=401,
                 content={"detail": "Missing X-MindWall-Key header"},
             )
-
-        if api_key != self.api_secret_key:
-            logger.warning("auth.invalid_key", path=path, method=request.method)
-            return JSONResponse(
+        elif not hmac.compare_digest(api_key, self._key_bytes):
+            logger.warning("auth.invalid_key", path=path, method=method)
+            response = ORJSONResponse(
                 status_code=403,
                 content={"detail": "Invalid API key"},
             )
+        else:
+            await self.app(scope, receive, send)
+            return
 
-        return await call_next(request)
+        await response(scope, receive, send)
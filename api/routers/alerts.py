@@ -5,7 +5,6 @@ Developed by Pradyumn Tandon (https://pradyumntandon.com) at VRIP7 (https://vrip
 GET/PATCH /api/alerts/* — Alert management endpoints.
 """
 
-import json
 from typing import Optional
 
 import structlog
@@ -81,21 +80,6 @@ async def get_alert_detail(request: Request, alert_id: int) -> AlertDetail:
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found for alert")
 
-    # Parse JSON fields
-    dimension_scores = {}
-    if analysis.dimension_scores:
-        try:
-            dimension_scores = json.loads(analysis.dimension_scores)
-        except json.JSONDecodeError:
-            dimension_scores = {}
-
-    prefilter_signals = []
-    if analysis.prefilter_signals:
-        try:
-            prefilter_signals = json.loads(analysis.prefilter_signals)
-        except json.JSONDecodeError:
-            prefilter_signals = []
-
     return AlertDetail(
         id=alert.id,
         analysis_id=alert.analysis_id,
@@ -109,14 +93,14 @@ async def get_alert_detail(request: Request, alert_id: int) -> AlertDetail:
         sender_display_name=analysis.sender_display_name,
         subject=analysis.subject,
         manipulation_score=analysis.manipulation_score,
-        dimension_scores=dimension_scores,
+        dimension_scores=analysis.dimension_scores or {},
         explanation=analysis.explanation or "",
         recommended_action=analysis.recommended_action or "proceed",
         channel=analysis.channel,
         received_at=analysis.received_at,
         analyzed_at=analysis.analyzed_at,
         prefilter_triggered=analysis.prefilter_triggered,
-        prefilter_signals=prefilter_signals,
+        prefilter_signals=analysis.prefilter_signals or [],
         processing_time_ms=analysis.processing_time_ms or 0,
     )
 
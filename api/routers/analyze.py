@@ -27,12 +27,9 @@ async def analyze_email(request: Request, payload: AnalyzeRequest) -> AnalyzeRes
     pipeline = request.app.state.pipeline
 
     try:
-        # Ensure employee record exists
-        employee_repo = request.app.state.employee_repo
-        await employee_repo.get_or_create(
-            email=payload.recipient_email,
-            display_name=None,
-        )
+        # Ensure employee record exists; known emails skip the database and
+        # new ones are created in the background while the pipeline runs
+        request.app.state.employee_repo.ensure_exists(payload.recipient_email)
 
         result = await pipeline.run(payload)
 
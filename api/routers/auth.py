@@ -9,7 +9,7 @@ import hmac
 
 import structlog
 from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 logger = structlog.get_logger(__name__)
@@ -37,7 +37,7 @@ async def login(request: Request, payload: LoginRequest):
 
     if not username_ok or not password_ok:
         logger.warning("auth.login_failed", username=payload.username)
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=401,
             content={"detail": "Invalid username or password"},
         )
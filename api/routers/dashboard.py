@@ -5,6 +5,7 @@ Developed by Pradyumn Tandon (https://pradyumntandon.com) at VRIP7 (https://vrip
 GET /api/dashboard/* — Endpoints for organization-wide threat dashboard.
 """
 
+import asyncio
 from datetime import datetime
 from typing import Optional
 
@@ -30,13 +31,17 @@ async def get_dashboard_summary(request: Request) -> DashboardSummary:
     alert_repo = request.app.state.alert_repo
     employee_repo = request.app.state.employee_repo
 
-    stats = await analysis_repo.get_summary_stats()
-    unack_counts = await alert_repo.get_unacknowledged_count()
-    employee_count = await employee_repo.get_count()
-    avg_dim_scores = await analysis_repo.get_avg_dimension_scores()
-    heatmap_raw = await analysis_repo.get_heatmap_data()
+    # Each summary figure comes from its own query, so all five go out at once
+    stats, unack_counts, employee_count, avg_dim_scores, heatmap_raw = await asyncio.gather(
+        analysis_repo.get_summary_stats(),
+        alert_repo.get_unacknowledged_count(),
+        employee_repo.get_count(),
+        analysis_repo.get_avg_dimension_scores(),
+        analysis_repo.get_heatmap_data(),
+    )
 
-    return DashboardSummary(
+    # Repository counts and averages are already ints and floats
+    return DashboardSummary.model_construct(
         total_analyses=stats["total_analyses"],
         average_score=stats["average_score"],
         high_risk_count=stats["high_risk_count"],
@@ -45,7 +50,7 @@ async def get_dashboard_summary(request: Request) -> DashboardSummary:
         unacknowledged_alerts=unack_counts,
         employee_count=employee_count,
         avg_dimension_scores=avg_dim_scores,
-        heatmap_data=HeatmapData(**heatmap_raw),
+        heatmap_data=HeatmapData.model_construct(**heatmap_raw),
     )
 
 
@@ -65,7 +70,7 @@ async def get_threat_timeline(
     )
 
     entries = [
-        TimelineEntry(
+        TimelineEntry.model_construct(
             bucket=b["bucket"],
             avg_score=b["avg_score"],
             count=b["count"],
@@ -73,7 +78,7 @@ async def get_threat_timeline(
         for b in buckets
     ]
 
-    return TimelineResponse(
+    return TimelineResponse.model_construct(
         entries=entries,
         start_date=start_date,
         end_date=end_date,
@@ -10,7 +10,7 @@ from typing import List, Optional
 
 import structlog
 from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from sqlalchemy import text
 
@@ -158,7 +158,7 @@ async def lookup_email_account(request: Request, username: str):
         row = result.fetchone()
 
     if not row:
-        return JSONResponse(status_code=404, content={"detail": "Account not found"})
+        return ORJSONResponse(status_code=404, content={"detail": "Account not found"})
 
     return {
         "email": row[0],
@@ -185,7 +185,7 @@ async def delete_email_account(request: Request, account_id: int):
         await session.commit()
 
         if result.rowcount == 0:
-            return JSONResponse(status_code=404, content={"detail": "Account not found"})
+            return ORJSONResponse(status_code=404, content={"detail": "Account not found"})
 
     logger.info("email_accounts.deleted", account_id=account_id)
     return {"status": "deleted", "id": account_id}
@@ -5,12 +5,12 @@ Developed by Pradyumn Tandon (https://pradyumntandon.com) at VRIP7 (https://vrip
 GET/POST /api/employees/* — Employee management, email account config, and risk profile endpoints.
 """
 
-import json
 from datetime import datetime
 from typing import Optional
 
 import structlog
 from fastapi import APIRouter, Request, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy import select, text
 
 from ..core.config import get_settings
@@ -22,7 +22,6 @@ from ..schemas.employee import (
     EmployeeCreateResponse,
     EmployeeRiskProfile,
     ProxyConnectionInfo,
-    ThreatSenderInfo,
 )
 
 logger = structlog.get_logger(__name__)
@@ -36,7 +35,7 @@ async def get_employees(
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
     sort_by_risk: bool = Query(True, description="Sort by risk score descending"),
-) -> EmployeePaginatedResponse:
+) -> ORJSONResponse:
     """Get paginated employee list with rolling risk scores."""
     employee_repo = request.app.state.employee_repo
     analysis_repo = request.app.state.analysis_repo
@@ -64,28 +63,29 @@ async def get_employees(
             )
             configured_emails = {row[0] for row in acct_result.fetchall()}
 
+    # EmployeeSummary-shaped dicts, one per row
     items = [
-        EmployeeSummary(
-            id=emp.id,
-            email=emp.email,
-            display_name=emp.display_name,
-            department=emp.department,
-            risk_score=emp.risk_score,
-            total_emails=email_counts.get(emp.email, {}).get("total", 0),
-            flagged_emails=email_counts.get(emp.email, {}).get("flagged", 0),
-            email_account_configured=emp.email in configured_emails,
-            created_at=emp.created_at,
-            updated_at=emp.updated_at,
-        )
+        {
+            "id": emp.id,
+            "email": emp.email,
+            "display_name": emp.display_name,
+            "department": emp.department,
+            "risk_score": emp.risk_score,
+            "total_emails": email_counts.get(emp.email, {}).get("total", 0),
+            "flagged_emails": email_counts.get(emp.email, {}).get("flagged", 0),
+            "email_account_configured": emp.email in configured_emails,
+            "created_at": emp.created_at,
+            "updated_at": emp.updated_at,
+        }
         for emp in result["items"]
     ]
 
-    return EmployeePaginatedResponse(
-        items=items,
-        total=result["total"],
-        limit=result["limit"],
-        offset=result["offset"],
-    )
+    return ORJSONResponse({
+        "items": items,
+        "total": result["total"],
+        "limit": result["limit"],
+        "offset": result["offset"],
+    })
 
 
 @router.post("", response_model=EmployeeCreateResponse, status_code=201)
@@ -264,7 +264,7 @@ async def get_employee_proxy_info(
 async def get_employee_risk_profile(
     request: Request,
     email: str,
-) -> EmployeeRiskProfile:
+) -> ORJSONResponse:
     """Get full risk profile including sender baselines for an employee."""
     employee_repo = request.app.state.employee_repo
 
@@ -280,12 +280,7 @@ async def get_employee_risk_profile(
     dim_counts = {}
     flagged_count = 0
     for analysis in profile.get("recent_analyses", []):
-        dim_scores = {}
-        if analysis.dimension_scores:
-            try:
-                dim_scores = json.loads(analysis.dimension_scores)
-            except json.JSONDecodeError:
-                dim_scores = {}
+        dim_scores = analysis.dimension_scores or {}
 
         for k, v in dim_scores.items():
             if isinstance(v, (int, float)):
@@ -313,22 +308,20 @@ async def get_employee_risk_profile(
         for k in dim_totals if dim_counts.get(k, 0) > 0
     }
 
-    top_senders = [
-        ThreatSenderInfo(**s) for s in profile.get("top_threat_senders", [])
-    ]
-
-    return EmployeeRiskProfile(
-        email=employee.email,
-        display_name=employee.display_name,
-        department=employee.department,
-        rolling_risk_score=profile["rolling_risk_score"],
-        total_emails=profile["total_analyses"],
-        flagged_emails=flagged_count,
-        total_analyses=profile["total_analyses"],
-        avg_dimension_scores=avg_dim_scores,
-        top_threat_senders=top_senders,
-        recent_analyses=recent_analyses_data,
-    )
+    # EmployeeRiskProfile shape
+    return ORJSONResponse({
+        "email": employee.email,
+        "display_name": employee.display_name,
+        "department": employee.department,
+        "rolling_risk_score": profile["rolling_risk_score"],
+        "total_emails": profile["total_analyses"],
+        "flagged_emails": flagged_count,
+        "total_analyses": profile["total_analyses"],
+        "avg_dimension_scores": avg_dim_scores,
+        "top_threat_senders": profile.get("top_threat_senders", []),
+        "recent_analyses": recent_analyses_data,
+        "recent_alerts": [],
+    })
 
 
 def _severity(score: Optional[float]) -> str:
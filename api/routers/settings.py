@@ -62,19 +62,7 @@ async def get_settings(request: Request) -> SystemSettings:
     """Get current system settings."""
     settings = request.app.state.settings
 
-    return SystemSettings(
-        ollama_base_url=settings.ollama_base_url,
-        ollama_model=settings.ollama_model,
-        ollama_timeout_seconds=settings.ollama_timeout_seconds,
-        alert_medium_threshold=settings.alert_medium_threshold,
-        alert_high_threshold=settings.alert_high_threshold,
-        alert_critical_threshold=settings.alert_critical_threshold,
-        prefilter_score_boost=settings.prefilter_score_boost,
-        behavioral_weight=settings.behavioral_weight,
-        llm_weight=settings.llm_weight,
-        log_level=settings.log_level,
-        workers=settings.workers,
-    )
+    return _current_settings(settings)
 
 
 @router.put("", response_model=SystemSettings)
@@ -92,19 +80,7 @@ async def update_settings(
     changes = payload.model_dump(exclude_none=True)
 
     if not changes:
-        return SystemSettings(
-            ollama_base_url=settings.ollama_base_url,
-            ollama_model=settings.ollama_model,
-            ollama_timeout_seconds=settings.ollama_timeout_seconds,
-            alert_medium_threshold=settings.alert_medium_threshold,
-            alert_high_threshold=settings.alert_high_threshold,
-            alert_critical_threshold=settings.alert_critical_threshold,
-            prefilter_score_boost=settings.prefilter_score_boost,
-            behavioral_weight=settings.behavioral_weight,
-            llm_weight=settings.llm_weight,
-            log_level=settings.log_level,
-            workers=settings.workers,
-        )
+        return _current_settings(settings)
 
     # Apply to in-memory settings
     if payload.ollama_timeout_seconds is not None:
@@ -133,7 +109,12 @@ async def update_settings(
 
     logger.info("settings.updated", changes=changes)
 
-    return SystemSettings(
+    return _current_settings(settings)
+
+
+def _current_settings(settings) -> SystemSettings:
+    """Snapshot the running settings, already typed by the app config, for a response."""
+    return SystemSettings.model_construct(
         ollama_base_url=settings.ollama_base_url,
         ollama_model=settings.ollama_model,
         ollama_timeout_seconds=settings.ollama_timeout_seconds,
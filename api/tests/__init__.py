@@ -0,0 +1 @@
+# MindWall — API Tests
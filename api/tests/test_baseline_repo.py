@@ -0,0 +1,129 @@
+"""
+MindWall — Baseline Repository Tests
+Developed by Pradyumn Tandon (https://pradyumntandon.com) at VRIP7 (https://vrip7.com)
+
+SQL-side EMA and send-hour mask upserts, on fresh databases and on
+databases carrying rows from the JSON-list typical_hours format.
+"""
+
+import sqlite3
+
+import pytest
+import pytest_asyncio
+
+from ..analysis.behavioral.baseline import hours_to_mask, mask_to_hours
+from ..db.database import create_engine_and_session, run_migrations
+from ..db.repositories.baseline_repo import BaselineRepository
+
+RECIPIENT = "employee@example.com"
+SENDER = "partner@example.com"
+
+# sender_baselines as created before typical_hours became a bit mask
+LEGACY_BASELINES_DDL = """
+CREATE TABLE sender_baselines (
+    id                  INTEGER PRIMARY KEY AUTOINCREMENT,
+    recipient_email     TEXT NOT NULL,
+    sender_email        TEXT NOT NULL,
+    avg_word_count      REAL,
+    avg_sentence_length REAL,
+    typical_hours       TEXT,
+    formality_score     REAL,
+    typical_requests    TEXT,
+    sample_count        INTEGER DEFAULT 0,
+    last_updated        DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(recipient_email, sender_email)
+);
+"""
+
+
+async def _open(db_path):
+    engine, session_factory = await create_engine_and_session(f"sqlite+aiosqlite:///{db_path}")
+    await run_migrations(engine)
+    return engine, BaselineRepository(session_factory)
+
+
+@pytest_asyncio.fixture
+async def repo(tmp_path):
+    engine, repo = await _open(tmp_path / "fresh.db")
+    yield repo
+    await engine.dispose()
+
+
+async def _upsert(repo, sender=SENDER, word_count=100.0, sentence_length=10.0,
+                  formality=0.5, send_hour=9, alpha=0.5) -> int:
+    return await repo.upsert_baseline_with_ema(
+        recipient_email=RECIPIENT,
+        sender_email=sender,
+        word_count=word_count,
+        avg_sentence_length=sentence_length,
+        formality_score=formality,
+        send_hour=send_hour,
+        alpha=alpha,
+    )
+
+
+@pytest.mark.asyncio
+async def test_first_email_creates_baseline_from_its_metrics(repo):
+    assert await _upsert(repo) == 1
+
+    row = await repo.get_baseline(RECIPIENT, SENDER)
+    assert row.avg_word_count == 100.0
+    assert row.avg_sentence_length == 10.0
+    assert row.formality_score == 0.5
+    assert hours_to_mask(row.typical_hours) == 1 << 9
+
+
+@pytest.mark.asyncio
+async def test_later_emails_fold_in_with_ema_and_set_hour_bits(repo):
+    await _upsert(repo, word_count=100.0, sentence_length=10.0, formality=0.5, send_hour=9)
+    count = await _upsert(repo, word_count=200.0, sentence_length=20.0, formality=1.0,
+                          send_hour=14, alpha=0.25)
+
+    assert count == 2
+    row = await repo.get_baseline(RECIPIENT, SENDER)
+    assert row.avg_word_count == pytest.approx(0.25 * 200.0 + 0.75 * 100.0)
+    assert row.avg_sentence_length == pytest.approx(0.25 * 20.0 + 0.75 * 10.0)
+    assert row.formality_score == pytest.approx(0.25 * 1.0 + 0.75 * 0.5)
+    assert mask_to_hours(hours_to_mask(row.typical_hours)) == [9, 14]
+
+
+@pytest.mark.asyncio
+async def test_unknown_send_hour_leaves_mask_unchanged(repo):
+    await _upsert(repo, send_hour=9)
+    await _upsert(repo, send_hour=None)
+
+    row = await repo.get_baseline(RECIPIENT, SENDER)
+    assert row.sample_count == 2
+    assert hours_to_mask(row.typical_hours) == 1 << 9
+
+
+@pytest.mark.asyncio
+async def test_legacy_hour_lists_survive_the_first_upsert(tmp_path):
+    db_path = tmp_path / "legacy.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(LEGACY_BASELINES_DDL)
+        conn.executemany(
+            "INSERT INTO sender_baselines (recipient_email, sender_email, avg_word_count, "
+            "avg_sentence_length, typical_hours, formality_score, sample_count) "
+            "VALUES (?, ?, 100.0, 10.0, ?, 0.5, 3)",
+            [
+                (RECIPIENT, SENDER, "[9, 14]"),
+                (RECIPIENT, "empty@example.com", "[]"),
+                (RECIPIENT, "broken@example.com", "[9, 14"),
+                (RECIPIENT, "odd@example.com", '[25, -1, "10", 8, 8]'),
+            ],
+        )
+    conn.close()
+
+    engine, repo = await _open(db_path)
+    try:
+        assert await _upsert(repo, send_hour=20) == 4
+        row = await repo.get_baseline(RECIPIENT, SENDER)
+        assert mask_to_hours(hours_to_mask(row.typical_hours)) == [9, 14, 20]
+
+        expected = {"empty@example.com": [], "broken@example.com": [], "odd@example.com": [8]}
+        for sender, hours in expected.items():
+            row = await repo.get_baseline(RECIPIENT, sender)
+            assert mask_to_hours(hours_to_mask(row.typical_hours)) == hours
+    finally:
+        await engine.dispose()
@@ -0,0 +1,64 @@
+"""
+MindWall — Employee Repository Tests
+Developed by Pradyumn Tandon (https://pradyumntandon.com) at VRIP7 (https://vrip7.com)
+
+Statement count of a risk-profile load, which must not grow with the
+number of analyses an employee has.
+"""
+
+import sqlite3
+
+import pytest
+from sqlalchemy import event
+
+from ..db.database import create_engine_and_session, run_migrations
+from ..db.repositories.employee_repo import EmployeeRepository
+
+EMPLOYEE = "employee@example.com"
+
+
+def _seed(db_path, analysis_count: int) -> None:
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("INSERT INTO employees (email, risk_score) VALUES (?, 0.0)", (EMPLOYEE,))
+        conn.executemany(
+            "INSERT INTO analyses (message_uid, recipient_email, sender_email, channel,"
+            " manipulation_score, dimension_scores, explanation, recommended_action,"
+            " llm_raw_response, analyzed_at)"
+            " VALUES (?, ?, ?, 'imap', ?, '{}', 'explanation', 'proceed', 'raw', datetime('now'))",
+            [
+                (f"uid-{i}", EMPLOYEE, f"sender{i % 7}@example.com", float(i % 90))
+                for i in range(analysis_count)
+            ],
+        )
+    conn.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("analysis_count", [3, 200])
+async def test_risk_profile_statement_count_is_constant(tmp_path, analysis_count):
+    db_path = tmp_path / "employees.db"
+    engine, session_factory = await create_engine_and_session(f"sqlite+aiosqlite:///{db_path}")
+    await run_migrations(engine)
+    _seed(db_path, analysis_count)
+    repo = EmployeeRepository(session_factory)
+
+    statements = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.lstrip().split(None, 1)[0].upper())
+
+    try:
+        profile = await repo.get_risk_profile(EMPLOYEE)
+        assert profile["total_analyses"] == min(analysis_count, 50)
+        assert len(profile["recent_analyses"]) == min(analysis_count, 10)
+        # Four reads, plus the UPDATE that stores the changed rolling score
+        assert statements == ["SELECT"] * 4 + ["UPDATE"]
+
+        # Unchanged score: the reads only
+        statements.clear()
+        await repo.get_risk_profile(EMPLOYEE)
+        assert statements == ["SELECT"] * 4
+    finally:
+        await engine.dispose()
@@ -0,0 +1,162 @@
+"""
+MindWall — Ollama Client Tests
+Developed by Pradyumn Tandon (https://pradyumntandon.com) at VRIP7 (https://vrip7.com)
+
+Concurrency and cancellation behavior of ParallelOllamaClient, with the
+HTTP call replaced by a fake that sleeps per prompt, and the overall
+generate() time limit against a slowly streaming server.
+"""
+
+import asyncio
+
+import httpx
+import orjson
+import pytest
+import pytest_asyncio
+
+from ..analysis.llm_client import OllamaClient, OllamaClientError, ParallelOllamaClient
+
+
+class FakeOllama:
+    """Stands in for OllamaClient.generate; the prompt text is its duration."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.started = []
+        self.cancelled = []
+
+    async def generate(self, system_prompt: str, user_prompt: str) -> str:
+        self.started.append(user_prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(float(user_prompt))
+        except asyncio.CancelledError:
+            self.cancelled.append(user_prompt)
+            raise
+        finally:
+            self.in_flight -= 1
+        return f"done {user_prompt}"
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    fake = FakeOllama()
+    monkeypatch.setattr(OllamaClient, "generate", fake.generate)
+    return fake
+
+
+@pytest_asyncio.fixture
+async def client():
+    client = ParallelOllamaClient("http://ollama.test", "test-model", max_parallel=4)
+    yield client
+    await client.close()
+
+
+async def _timed(client, prompt: str) -> float:
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await client.generate("system", prompt)
+    return loop.time() - start
+
+
+@pytest.mark.asyncio
+async def test_slow_call_does_not_hold_back_later_calls(fake, client):
+    slow = asyncio.create_task(_timed(client, "1.0"))
+    await asyncio.sleep(0)
+    fast = await asyncio.gather(*(_timed(client, "0.05") for _ in range(3)))
+
+    assert max(fast) < 0.5
+    assert not slow.done()
+    assert await slow >= 1.0
+
+
+@pytest.mark.asyncio
+async def test_in_flight_calls_are_capped(fake, client):
+    results = await asyncio.gather(*(client.generate("system", "0.05") for _ in range(10)))
+
+    assert results == ["done 0.05"] * 10
+    assert fake.max_in_flight == client.max_parallel
+
+
+@pytest.mark.asyncio
+async def test_calls_start_without_delay(fake, client):
+    assert await _timed(client, "0") < 0.01
+
+
+@pytest.mark.asyncio
+async def test_cancelled_in_flight_call_drops_request_and_frees_slot(fake, client):
+    busy = [asyncio.create_task(client.generate("system", "0.3")) for _ in range(3)]
+    victim = asyncio.create_task(client.generate("system", "5"))
+    await asyncio.sleep(0.01)
+
+    victim.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await victim
+
+    assert fake.cancelled == ["5"]
+    # The freed slot is usable while the other three are still running
+    assert await _timed(client, "0.01") < 0.2
+    await asyncio.gather(*busy)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_queued_call_never_starts(fake, client):
+    busy = [asyncio.create_task(client.generate("system", "0.1")) for _ in range(4)]
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(client.generate("system", "queued"))
+    await asyncio.sleep(0.01)
+
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    await asyncio.gather(*busy)
+
+    assert "queued" not in fake.started
+    assert fake.in_flight == 0
+    assert await client.generate("system", "0") == "done 0"
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_only_their_caller(fake, client):
+    outcomes = await asyncio.gather(
+        client.generate("system", "not-a-number"),
+        client.generate("system", "0.01"),
+        return_exceptions=True,
+    )
+
+    assert isinstance(outcomes[0], ValueError)
+    assert outcomes[1] == "done 0.01"
+
+
+def _trickling_client(interval: float) -> OllamaClient:
+    """OllamaClient whose server streams one token every `interval` seconds, forever."""
+
+    async def ndjson():
+        while True:
+            await asyncio.sleep(interval)
+            yield orjson.dumps({"response": " ", "done": False}) + b"\n"
+
+    client = OllamaClient("http://ollama.test", "test-model", timeout=30)
+    client._client = httpx.AsyncClient(
+        base_url="http://ollama.test",
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, content=ndjson())),
+    )
+    return client
+
+
+@pytest.mark.asyncio
+async def test_generate_time_limit_covers_whole_stream():
+    client = _trickling_client(interval=0.02)
+    # Set after construction, as the settings router does
+    client.timeout = 0.2
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    try:
+        with pytest.raises(OllamaClientError, match="timed out"):
+            await client.generate("system", "prompt")
+    finally:
+        await client.close()
+
+    assert loop.time() - start < 0.5
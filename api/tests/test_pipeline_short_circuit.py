@@ -0,0 +1,101 @@
+"""
+MindWall — LLM Short-Circuit Tests
+Developed by Pradyumn Tandon (https://pradyumntandon.com) at VRIP7 (https://vrip7.com)
+
+Boundaries of AnalysisPipeline._conclusive_action, the rule that lets
+benign mail from established senders skip LLM inference.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from ..analysis.behavioral.deviation import DeviationContext, DeviationScorer
+from ..analysis.behavioral.features import extract_features
+from ..analysis.pipeline import AnalysisPipeline
+from ..analysis.prefilter import PreFilter, PreFilterResult
+
+LOW_CUTOFF = 2.0
+# Deviation score whose weighted contribution (x0.12) lands exactly on the cutoff
+DEVIATION_AT_CUTOFF = LOW_CUTOFF / 0.12
+
+ESTABLISHED = {"sample_count": DeviationScorer.MIN_SAMPLES}
+
+
+@pytest.fixture
+def pipeline():
+    return AnalysisPipeline(
+        llm=None,
+        analysis_repo=None,
+        alert_repo=None,
+        baseline_repo=None,
+        ws_manager=None,
+        llm_skip_low_cutoff=LOW_CUTOFF,
+    )
+
+
+def _action(pipeline, score_boost=0.0, signals=(), deviation=0.0, baseline=ESTABLISHED):
+    prefilter = PreFilterResult(triggered=bool(signals), signals=list(signals), score_boost=score_boost)
+    return pipeline._conclusive_action(prefilter, DeviationContext(deviation_score=deviation), baseline)
+
+
+def test_quiet_email_from_established_sender_proceeds(pipeline):
+    assert _action(pipeline) == "proceed"
+
+
+def test_weighted_deviation_just_under_cutoff_proceeds(pipeline):
+    assert _action(pipeline, deviation=DEVIATION_AT_CUTOFF - 0.1) == "proceed"
+
+
+def test_weighted_deviation_at_cutoff_runs_llm(pipeline):
+    assert _action(pipeline, deviation=DEVIATION_AT_CUTOFF) is None
+
+
+def test_any_prefilter_signal_runs_llm(pipeline):
+    assert _action(pipeline, signals=["all_caps_subject"]) is None
+
+
+def test_sender_below_min_samples_runs_llm(pipeline):
+    thin = {"sample_count": DeviationScorer.MIN_SAMPLES - 1}
+    assert _action(pipeline, baseline=thin) is None
+
+
+def test_new_sender_runs_llm(pipeline):
+    assert _action(pipeline, baseline=None) is None
+
+
+def test_zero_cutoff_disables_the_skip(pipeline):
+    pipeline.llm_skip_low_cutoff = 0.0
+    assert _action(pipeline) is None
+
+
+def test_most_suspicious_rule_score_still_runs_llm(pipeline):
+    # Every content category at its cap, spoofed sender, odd hour, caps
+    # subject and exclamations (62) plus full behavioral deviation
+    assert _action(pipeline, score_boost=62.0, signals=["spoofed_sender_pattern"], deviation=100.0) is None
+
+
+def test_routine_email_from_real_stages_proceeds(pipeline):
+    body = "Hi Sam. Attached are the meeting notes from Tuesday. Talk soon."
+    received_at = datetime(2026, 3, 2, 10, 15, tzinfo=timezone.utc)
+    features = extract_features(body)
+    baseline = {
+        "sample_count": 12,
+        "avg_word_count": features.word_count,
+        "avg_sentence_length": features.avg_sentence_length,
+        "typical_hours_mask": 1 << 10,
+        "formality_score": DeviationScorer._quick_formality(features.text_lower),
+    }
+
+    prefilter = PreFilter().evaluate(
+        subject="Meeting notes",
+        body=body,
+        sender_email="sam.lee@example.com",
+        received_at=received_at,
+    )
+    deviation = DeviationScorer().score(
+        body=body, received_at=received_at, baseline=baseline, features=features
+    )
+
+    assert not prefilter.triggered
+    assert pipeline._conclusive_action(prefilter, deviation, baseline) == "proceed"
@@ -0,0 +1,40 @@
+"""
+MindWall — Pre-Filter Tests
+Developed by Pradyumn Tandon (https://pradyumntandon.com) at VRIP7 (https://vrip7.com)
+
+The content matcher must report the same patterns whether or not
+Hyperscan is installed, including on text with non-ASCII whitespace and
+letters.
+"""
+
+import pytest
+
+from ..analysis import prefilter
+
+TEXTS = [
+    "Please send the wire transfer immediately.",
+    "Please send the wire\xa0transfer immediately.",
+    "Your account will be\u2003suspended; final\xa0notice.",
+    "Résumé attached. Café meeting at noon, nothing urgent.",
+    "éurgent and urgenté are not words we match",
+    "Der CEO möchte eine Überweisung per gift card, bitte ASAP!",
+    "Ünauthorized access? No: unauthorized access to the portal.",
+    "Plain note about lunch plans.",
+    "",
+]
+
+
+def _re_matches(text: str) -> set[str]:
+    return {m.lastgroup for m in prefilter._CONTENT_RE.finditer(text)}
+
+
+def test_non_breaking_space_is_whitespace_on_either_path():
+    assert "suspicious_0" in _re_matches("wire\xa0transfer")
+    assert "suspicious_0" in prefilter._match_content("wire\xa0transfer")
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_hyperscan_and_re_paths_agree(text):
+    if prefilter._CONTENT_DB is None:
+        pytest.skip("hyperscan not installed")
+    assert prefilter._match_content(text) == _re_matches(text)
@@ -0,0 +1,83 @@
+"""
+MindWall — Ollama Stream End Detection Tests
+Developed by Pradyumn Tandon (https://pradyumntandon.com) at VRIP7 (https://vrip7.com)
+
+_JsonObjectEnd brace tracking, and OllamaClient.generate leaving the
+NDJSON stream once the response object closes.
+"""
+
+import httpx
+import orjson
+import pytest
+
+from ..analysis.llm_client import OllamaClient, _JsonObjectEnd
+
+
+def _feed_all(pieces) -> list[bool]:
+    tracker = _JsonObjectEnd()
+    return [tracker.feed(piece) for piece in pieces]
+
+
+def test_flat_object_closes_on_final_brace():
+    assert _feed_all(['{"score": 10}']) == [True]
+
+
+def test_object_split_across_chunks():
+    assert _feed_all(['{"sco', 're": {"a"', ": 1}", "}"]) == [False, False, False, True]
+
+
+def test_nested_objects_close_only_at_top_level():
+    assert _feed_all(['{"a": {"b": {}}', ', "c": []', "}"]) == [False, False, True]
+
+
+def test_braces_inside_strings_are_ignored():
+    assert _feed_all(['{"explanation": "uses } and { freely"', "}"]) == [False, True]
+
+
+def test_escaped_quote_does_not_end_string():
+    assert _feed_all(['{"explanation": "said \\"}\\" twice"', "}"]) == [False, True]
+
+
+def test_escape_split_across_chunks():
+    assert _feed_all(['{"x": "a\\', '"}', '"}']) == [False, False, True]
+
+
+def test_escaped_backslash_before_closing_quote():
+    # "a\\" is a complete string, so the brace after it closes the object
+    assert _feed_all(['{"x": "a\\\\"}']) == [True]
+
+
+def test_text_before_object_and_stray_closing_brace():
+    assert _feed_all(["Sure } here it is: ", '{"a": 1}']) == [False, True]
+
+
+def test_incomplete_object_never_reports_closed():
+    assert _feed_all(['{"a": {"b": 1}', "   "]) == [False, False]
+
+
+@pytest.mark.asyncio
+async def test_generate_stops_reading_after_object_closes():
+    lines_sent = []
+
+    async def ndjson():
+        chunks = ['{"score": ', '{"a": "}"}', "}", "\n\n", "   ", "never"]
+        for text in chunks:
+            lines_sent.append(text)
+            yield orjson.dumps({"response": text, "done": False}) + b"\n"
+        yield orjson.dumps({"response": "", "done": True}) + b"\n"
+
+    def handler(request):
+        return httpx.Response(200, content=ndjson())
+
+    client = OllamaClient("http://ollama.test", "test-model")
+    await client._client.aclose()
+    client._client = httpx.AsyncClient(
+        base_url="http://ollama.test", transport=httpx.MockTransport(handler)
+    )
+    try:
+        result = await client.generate("system", "prompt")
+    finally:
+        await client.close()
+
+    assert result == '{"score": {"a": "}"}}'
+    assert "never" not in lines_sent
@@ -5,9 +5,9 @@ Developed by Pradyumn Tandon (https://pradyumntandon.com) at VRIP7 (https://vrip
 Manages active WebSocket connections for real-time alert broadcasting.
 """
 
-import json
 from typing import Any, Dict, List
 
+import orjson
 import structlog
 from fastapi import WebSocket
 
@@ -43,7 +43,7 @@ class WebSocketManager:
         if not self._active_connections:
             return
 
-        payload = json.dumps(message, default=str)
+        payload = orjson.dumps(message, default=str).decode()
         disconnected = []
 
         for connection in self._active_connections: